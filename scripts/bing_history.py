@@ -0,0 +1,116 @@
+"""Local Bing Webmaster history for bing_report.py --history.
+
+The Bing API only ever returns a rolling ~6-month window, so anything older is lost
+unless it was kept. This stores the daily rows of GetQueryStats, GetPageStats,
+GetRankAndTrafficStats and GetCrawlStats in SQLite
+(scripts/.cache/bing-history.sqlite), one row per (endpoint, date, key), where key
+is the query or page for the stats endpoints and "" for the site-level ones. Rows
+are kept verbatim as JSON, so the report's aggregation code reads them back exactly
+as if they came from the API, for any window.
+
+Bing has no server-side date filter, so a sync still streams the whole payload, but
+only rows newer than the endpoint's high-water mark (minus REFRESH_DAYS, since
+recent days get revised) are written, and an endpoint synced less than
+MIN_SYNC_INTERVAL ago is not downloaded at all.
+
+Unlike scripts/.cache's other files this one is not a cache: deleting it loses the
+history older than Bing's window.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = REPO_ROOT / "scripts" / ".cache" / "bing-history.sqlite"
+ENDPOINT_KEYS = {   # endpoint -> field identifying a row within a day (None: one row per day)
+    "GetQueryStats": "Query",
+    "GetPageStats": "Query",
+    "GetRankAndTrafficStats": None,
+    "GetCrawlStats": None,
+}
+REFRESH_DAYS = 3                 # days below the high-water mark that are rewritten
+MIN_SYNC_INTERVAL = 6 * 60 * 60  # seconds between downloads of the same endpoint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily (
+    endpoint TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    row      TEXT NOT NULL,   -- the API row, as JSON
+    PRIMARY KEY (endpoint, date, key)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    endpoint   TEXT PRIMARY KEY,
+    high_water TEXT,          -- newest date stored
+    synced_at  REAL NOT NULL
+);
+"""
+
+
+class BingHistory:
+    """Daily Bing rows per endpoint. Safe to share across threads."""
+
+    def __init__(self, path: Path = DB_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def state(self, endpoint: str) -> tuple:
+        """(high_water date or None, synced_at or None) for endpoint."""
+        with self.lock:
+            row = self.db.execute("SELECT high_water, synced_at FROM sync_state WHERE endpoint = ?",
+                                  (endpoint,)).fetchone()
+        if not row:
+            return None, None
+        return (date.fromisoformat(row[0]) if row[0] else None), row[1]
+
+    def needs_sync(self, endpoint: str) -> bool:
+        _, synced_at = self.state(endpoint)
+        return synced_at is None or time.time() - synced_at >= MIN_SYNC_INTERVAL
+
+    def upsert(self, endpoint: str, rows, day_of) -> tuple:
+        """Store rows newer than the high-water mark; return (written, high_water).
+
+        day_of(row) returns the row's date (or None to skip it). Rows are consumed as
+        they stream in; only the ones being written are held until the commit.
+        """
+        key_field = ENDPOINT_KEYS[endpoint]
+        high_water, _ = self.state(endpoint)
+        floor = high_water - timedelta(days=REFRESH_DAYS) if high_water else None
+        batch, newest = [], high_water
+        for r in rows:
+            day = day_of(r)
+            if day is None or (floor and day < floor):
+                continue
+            key = "" if key_field is None else r.get(key_field)
+            if key is None:
+                continue
+            batch.append((endpoint, day.isoformat(), key, json.dumps(r, separators=(",", ":"))))
+            newest = max(newest, day) if newest else day
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT OR REPLACE INTO daily (endpoint, date, key, row) "
+                                "VALUES (?, ?, ?, ?)", batch)
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state (endpoint, high_water, synced_at) VALUES (?, ?, ?)",
+                (endpoint, newest.isoformat() if newest else None, time.time()))
+            self.db.execute("COMMIT")
+        return len(batch), newest
+
+    def rows(self, endpoint: str, start: date, end: date):
+        """Yield the stored API rows of endpoint dated start..end (inclusive), oldest first."""
+        with self.lock:
+            stored = self.db.execute(
+                "SELECT row FROM daily WHERE endpoint = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (endpoint, start.isoformat(), end.isoformat())).fetchall()
+        for (row,) in stored:
+            yield json.loads(row)
+
+    def close(self) -> None:
+        self.db.close()
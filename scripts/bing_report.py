@@ -10,6 +10,8 @@ Usage:
     python scripts/bing_report.py --type pages       # top pages only
     python scripts/bing_report.py --type crawl       # crawl + index health
     python scripts/bing_report.py --json             # output as JSON
+    python scripts/bing_report.py --history          # sync the local history store, report from it
+    python scripts/bing_report.py --since 2025-01-01 --until 2025-03-31   # any stored window
 
 Prerequisites:
     - API key at scripts/credentials/bing-api-key.txt
@@ -17,24 +19,56 @@ Prerequisites:
 
 Note on windows: the Bing API returns a rolling ~6-month window of daily rows with
 no server-side date filter, so --days narrows client-side over what Bing returns.
+--history (implied by --since/--until) first syncs all four endpoints into the
+local store in bing_history.py, which keeps rows past Bing's window, and then reads
+the requested window from it.
+
+All calls share one requests.Session (keep-alive connection pool, gzip responses,
+429/5xx retried with exponential backoff honouring Retry-After). The summary fetches
+its three endpoints concurrently, and --json includes per-endpoint latency.
+
+Responses are parsed incrementally as they stream in (rows of the "d" array are
+decoded one by one, never the whole payload), /Date(ms)/ values are compared as
+integers against the cutoff in milliseconds, and aggregate() buffers rows in
+fixed-size column blocks that are reduced per key with np.bincount. Memory is
+bounded by the number of distinct keys plus one block, whatever the window.
 """
 
 import argparse
+import codecs
 import json
 import re
 import sys
-import urllib.parse
-import urllib.request
-from collections import defaultdict
-from datetime import date, datetime, timedelta, timezone
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
 
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import bing_history
+
 REPO_ROOT = Path(__file__).resolve().parent.parent
 KEY_PATH = REPO_ROOT / "scripts" / "credentials" / "bing-api-key.txt"
 SITE_URL = "https://avinashsangle.com/"
 API_BASE = "https://ssl.bing.com/webmaster/api.svc/json"
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+BACKOFF_FACTOR = 1.0          # retries sleep 1s, 2s, 4s, ... (or Retry-After)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+STREAM_CHUNK = 64 * 1024      # bytes read from the response at a time
+AGG_BLOCK = 65_536            # rows buffered before a vectorized reduction
+DAY_MS = 86_400_000
 
-_MS_DATE = re.compile(r"/Date\((\d+)(?:[+-]\d+)?\)/")
+_ARRAY_START = re.compile(r'"d"\s*:\s*(\[|null)')
+_session = None
+_session_lock = threading.Lock()
+latencies: dict = {}   # endpoint -> {"ms", "attempts", "bytes"}, filled by bing_stream()
 
 
 def load_key() -> str:
@@ -43,59 +77,191 @@ def load_key() -> str:
     return KEY_PATH.read_text().strip()
 
 
-def bing_get(endpoint: str, key: str, **params) -> list:
+def get_session() -> requests.Session:
+    """The shared keep-alive session (thread-safe for concurrent GETs)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR,
+                          status_forcelist=RETRY_STATUSES, allowed_methods=["GET"],
+                          respect_retry_after_header=True, raise_on_status=False)
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS,
+                                                  max_retries=retry))
+            session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip"})
+            _session = session
+    return _session
+
+
+def _iter_rows(chunks):
+    """Yield the objects of the {"d": [...]} array from byte chunks, one at a time."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")("replace")
+    chunks = iter(chunks)
+    buf = ""
+
+    def more() -> bool:
+        nonlocal buf
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buf += text.decode(chunk)
+        return True
+
+    while not (m := _ARRAY_START.search(buf)):
+        if not more():
+            return
+    if m.group(1) == "null":
+        return
+    pos = m.end()
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("need more data", buf, pos)
+            # Elements are objects, so a row cut off by the chunk boundary fails to decode.
+            row, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not more():
+                raise
+            continue
+        yield row
+        if pos > STREAM_CHUNK:
+            buf, pos = buf[pos:], 0
+
+
+def bing_stream(endpoint: str, key: str, **params):
+    """Yield the rows of an endpoint's response while it is still downloading."""
     params["apikey"] = key
     params["siteUrl"] = SITE_URL
-    url = f"{API_BASE}/{endpoint}?{urllib.parse.urlencode(params)}"
-    req = urllib.request.Request(url, headers={"Accept": "application/json"})
+    started = time.perf_counter()
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            payload = json.load(resp)
-    except urllib.error.HTTPError as exc:
-        body = exc.read().decode("utf-8", "replace")[:300]
-        sys.exit(f"Bing API {endpoint} failed ({exc.code}): {body}")
-    return payload.get("d", []) or []
+        resp = get_session().get(f"{API_BASE}/{endpoint}", params=params, timeout=30, stream=True)
+    except requests.RequestException as exc:
+        sys.exit(f"Bing API {endpoint} failed: {exc}")
+    with resp:
+        if resp.status_code >= 400:
+            sys.exit(f"Bing API {endpoint} failed ({resp.status_code}): {resp.text[:300]}")
+        size = 0
+
+        def chunks():
+            nonlocal size
+            for chunk in resp.iter_content(STREAM_CHUNK):  # gzip is decoded here
+                size += len(chunk)
+                yield chunk
+
+        try:
+            yield from _iter_rows(chunks())
+        except (json.JSONDecodeError, requests.RequestException) as exc:
+            sys.exit(f"Bing API {endpoint} returned an unreadable response: {exc}")
+        retries = resp.raw.retries
+        latencies[endpoint] = {
+            "ms": round((time.perf_counter() - started) * 1000),
+            "attempts": 1 + (len(retries.history) if retries else 0),
+            "bytes": size,
+        }
+
+
+def bing_fetch_many(key: str, consumers: dict) -> dict:
+    """Stream independent endpoints concurrently over the shared session.
+
+    consumers maps an endpoint to a function of its row iterator (e.g. aggregate);
+    returns {endpoint: consumer result}. Rows are consumed as they arrive, so no
+    endpoint's full payload is ever held in memory.
+    """
+    def run(endpoint):
+        return consumers[endpoint](bing_stream(endpoint, key))
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(consumers))) as pool:
+        return dict(zip(consumers, pool.map(run, consumers)))
+
+
+def ms_date(value: str) -> int | None:
+    """Epoch milliseconds from Bing's "/Date(1718064000000-0700)/" (offset ignored)."""
+    if not value or not value.startswith("/Date("):
+        return None
+    digits = value[6:value.find(")", 6)]
+    for sign in "+-":
+        cut = digits.find(sign, 1)
+        if cut > 0:
+            digits = digits[:cut]
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+def cutoff_ms(cutoff: date) -> int:
+    """Epoch milliseconds of UTC midnight on cutoff: rows dated that day or later pass."""
+    return (cutoff.toordinal() - date(1970, 1, 1).toordinal()) * DAY_MS
 
 
 def parse_ms_date(value: str):
-    m = _MS_DATE.search(value or "")
-    if not m:
-        return None
-    return datetime.fromtimestamp(int(m.group(1)) / 1000, tz=timezone.utc).date()
+    ms = ms_date(value)
+    return None if ms is None else date.fromordinal(date(1970, 1, 1).toordinal() + ms // DAY_MS)
+
+
+def row_date(row: dict):
+    return parse_ms_date(row.get("Date"))
 
 
-def within(d, cutoff) -> bool:
-    return d is not None and d >= cutoff
+def aggregate(rows, key_field: str, cutoff: date) -> list:
+    """Collapse per-(item, date) rows into per-item totals with weighted position.
 
+    rows may be any iterable (e.g. bing_stream()); it is consumed once. Rows are
+    buffered as AGG_BLOCK-sized columns of (key code, clicks, impressions,
+    position x impressions) and each block is reduced with np.bincount.
+    """
+    floor = cutoff_ms(cutoff)
+    index: dict = {}
+    codes, clicks, impressions, pos_weight = array("q"), array("d"), array("d"), array("d")
+    sums = np.zeros((3, 0))
+
+    def flush():
+        nonlocal sums
+        k = len(index)
+        code = np.array(codes, dtype=np.int64)  # buffer copy; the arrays are reused below
+        block = np.stack([np.bincount(code, weights=np.array(col, dtype=np.float64), minlength=k)
+                          for col in (clicks, impressions, pos_weight)])
+        sums = np.pad(sums, ((0, 0), (0, k - sums.shape[1]))) + block
+        for col in (codes, clicks, impressions, pos_weight):
+            del col[:]
 
-def aggregate(rows: list, key_field: str, cutoff) -> list:
-    """Collapse per-(item, date) rows into per-item totals with weighted position."""
-    agg = defaultdict(lambda: {"clicks": 0, "impressions": 0, "pos_weight": 0.0})
     for r in rows:
-        if not within(parse_ms_date(r.get("Date", "")), cutoff):
+        ms = ms_date(r.get("Date"))
+        if ms is None or ms < floor:
             continue
         name = r.get(key_field)
         if name is None:
             continue
-        clicks = int(r.get("Clicks", 0))
         impr = int(r.get("Impressions", 0))
-        pos = float(r.get("AvgImpressionPosition", 0) or 0)
-        bucket = agg[name]
-        bucket["clicks"] += clicks
-        bucket["impressions"] += impr
-        bucket["pos_weight"] += pos * impr
-    out = []
-    for name, b in agg.items():
-        impr = b["impressions"]
-        out.append({
-            "name": name,
-            "clicks": b["clicks"],
-            "impressions": impr,
-            "ctr": round(b["clicks"] / impr * 100, 1) if impr else 0.0,
-            "position": round(b["pos_weight"] / impr, 1) if impr else 0.0,
-        })
-    out.sort(key=lambda x: (x["clicks"], x["impressions"]), reverse=True)
-    return out
+        codes.append(index.setdefault(name, len(index)))
+        clicks.append(int(r.get("Clicks", 0)))
+        impressions.append(impr)
+        pos_weight.append(float(r.get("AvgImpressionPosition", 0) or 0) * impr)
+        if len(codes) >= AGG_BLOCK:
+            flush()
+    if codes:
+        flush()
+    if not index:
+        return []
+
+    total_clicks, total_impr, total_pos = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ctr = np.where(total_impr > 0, np.round(total_clicks / total_impr * 100, 1), 0.0)
+        position = np.where(total_impr > 0, np.round(total_pos / total_impr, 1), 0.0)
+    order = np.lexsort((-total_impr, -total_clicks))
+    names = list(index)
+    return [{
+        "name": names[i],
+        "clicks": int(total_clicks[i]),
+        "impressions": int(total_impr[i]),
+        "ctr": float(ctr[i]),
+        "position": float(position[i]),
+    } for i in order]
 
 
 def print_table(headers: list, rows: list) -> None:
@@ -119,39 +285,81 @@ def strip_host(url: str) -> str:
     return (url or "").replace("https://avinashsangle.com", "").replace("http://avinashsangle.com", "") or "/"
 
 
-def run_summary(key: str, days: int, as_json: bool) -> None:
-    cutoff = date.today() - timedelta(days=days)
+def traffic_totals(rows, cutoff: date) -> tuple:
+    """(clicks, impressions) summed over GetRankAndTrafficStats rows since cutoff."""
+    floor = cutoff_ms(cutoff)
+    clicks = impressions = 0
+    for r in rows:
+        ms = ms_date(r.get("Date"))
+        if ms is not None and ms >= floor:
+            clicks += int(r.get("Clicks", 0))
+            impressions += int(r.get("Impressions", 0))
+    return clicks, impressions
+
 
-    traffic = bing_get("GetRankAndTrafficStats", key)
-    t_clicks = t_impr = 0
-    for r in traffic:
-        if within(parse_ms_date(r.get("Date", "")), cutoff):
-            t_clicks += int(r.get("Clicks", 0))
-            t_impr += int(r.get("Impressions", 0))
+def sync_history(key: str, history: bing_history.BingHistory) -> None:
+    """Write rows newer than each endpoint's high-water mark into the history store."""
+    endpoints = [e for e in bing_history.ENDPOINT_KEYS if history.needs_sync(e)]
+    if not endpoints:
+        return
+    results = bing_fetch_many(key, {
+        e: (lambda rows, e=e: history.upsert(e, rows, row_date)) for e in endpoints
+    })
+    for endpoint, (written, high_water) in results.items():
+        print(f"  history: {endpoint} +{written} row(s), newest {high_water}", file=sys.stderr)
+
+
+def fetch_window(key: str, consumers: dict, since: date, until: date,
+                 history: bing_history.BingHistory | None = None) -> dict:
+    """Feed each endpoint's rows to its consumer, from the API or the history store.
+
+    The API always returns its whole rolling window up to today; consumers apply
+    the since cutoff. The history store is read for since..until only.
+    """
+    if history is None:
+        return bing_fetch_many(key, consumers)
+    return {e: consume(history.rows(e, since, until)) for e, consume in consumers.items()}
+
+
+def period_label(since: date, until: date) -> str:
+    if until == date.today():
+        return f"last {(until - since).days} days (since {since})"
+    return f"{since} to {until}"
+
+
+def run_summary(key: str, since: date, until: date, as_json: bool,
+                history: bing_history.BingHistory | None = None) -> None:
+    fetched = fetch_window(key, {
+        "GetRankAndTrafficStats": lambda rows: traffic_totals(rows, since),
+        "GetQueryStats": lambda rows: aggregate(rows, "Query", since),
+        "GetPageStats": lambda rows: aggregate(rows, "Query", since),
+    }, since, until, history)
+    t_clicks, t_impr = fetched["GetRankAndTrafficStats"]
     totals = {
         "clicks": t_clicks,
         "impressions": t_impr,
         "ctr": round(t_clicks / t_impr * 100, 2) if t_impr else 0.0,
     }
 
-    queries = aggregate(bing_get("GetQueryStats", key), "Query", cutoff)
-    pages = [{**p, "name": strip_host(p["name"])}
-             for p in aggregate(bing_get("GetPageStats", key), "Query", cutoff)]
+    queries = fetched["GetQueryStats"]
+    pages = [{**p, "name": strip_host(p["name"])} for p in fetched["GetPageStats"]]
     opportunities = [q for q in queries if 10.5 <= q["position"] <= 20.5 and q["impressions"] >= 3][:10]
 
     if as_json:
         print(json.dumps({
-            "period_days": days,
-            "since": str(cutoff),
+            "period_days": (until - since).days,
+            "since": str(since),
+            "until": str(until),
             "totals": totals,
             "top_queries": queries[:15],
             "top_pages": pages[:15],
             "opportunities": opportunities,
+            "latency": latencies,
         }, indent=2))
         return
 
     print(f"\n{'=' * 60}")
-    print(f"  Bing Webmaster Report: last {days} days (since {cutoff})")
+    print(f"  Bing Webmaster Report: {period_label(since, until)}")
     print(f"  Site: avinashsangle.com  (also feeds Copilot + ChatGPT search)")
     print(f"{'=' * 60}\n")
 
@@ -176,26 +384,31 @@ def run_summary(key: str, days: int, as_json: bool) -> None:
     print()
 
 
-def run_single(key: str, days: int, report_type: str, as_json: bool) -> None:
-    cutoff = date.today() - timedelta(days=days)
+def crawl_health(rows, cutoff: date) -> dict:
+    floor = cutoff_ms(cutoff)
+    in_index = crawled = inlinks = c4xx = c5xx = 0
+    for r in rows:
+        ms = ms_date(r.get("Date"))
+        if ms is None or ms < floor:
+            continue
+        crawled += int(r.get("CrawledPages", 0))
+        c4xx += int(r.get("Code4xx", 0))
+        c5xx += int(r.get("Code5xx", 0))
+        in_index = max(in_index, int(r.get("InIndex", 0)))
+        inlinks = max(inlinks, int(r.get("InLinks", 0)))
+    return {"pages_in_index": in_index, "inbound_links": inlinks,
+            "pages_crawled": crawled, "errors_4xx": c4xx, "errors_5xx": c5xx}
 
+
+def run_single(key: str, since: date, until: date, report_type: str, as_json: bool,
+               history: bing_history.BingHistory | None = None) -> None:
     if report_type == "crawl":
-        rows = bing_get("GetCrawlStats", key)
-        in_index = crawled = inlinks = c4xx = c5xx = 0
-        for r in rows:
-            if not within(parse_ms_date(r.get("Date", "")), cutoff):
-                continue
-            crawled += int(r.get("CrawledPages", 0))
-            c4xx += int(r.get("Code4xx", 0))
-            c5xx += int(r.get("Code5xx", 0))
-            in_index = max(in_index, int(r.get("InIndex", 0)))
-            inlinks = max(inlinks, int(r.get("InLinks", 0)))
-        data = {"pages_in_index": in_index, "inbound_links": inlinks,
-                "pages_crawled": crawled, "errors_4xx": c4xx, "errors_5xx": c5xx}
+        data = fetch_window(key, {"GetCrawlStats": lambda rows: crawl_health(rows, since)},
+                            since, until, history)["GetCrawlStats"]
         if as_json:
-            print(json.dumps(data, indent=2))
+            print(json.dumps({**data, "latency": latencies}, indent=2))
         else:
-            print(f"\n  Crawl + Index Health — last {days} days (since {cutoff})\n")
+            print(f"\n  Crawl + Index Health — {period_label(since, until)}\n")
             print(f"  Pages in Bing index : {data['pages_in_index']}")
             print(f"  Inbound links       : {data['inbound_links']}")
             print(f"  Pages crawled       : {data['pages_crawled']}")
@@ -204,7 +417,8 @@ def run_single(key: str, days: int, report_type: str, as_json: bool) -> None:
         return
 
     endpoint, field = ("GetQueryStats", "Query") if report_type == "queries" else ("GetPageStats", "Query")
-    data = aggregate(bing_get(endpoint, key), field, cutoff)
+    data = fetch_window(key, {endpoint: lambda rows: aggregate(rows, field, since)},
+                        since, until, history)[endpoint]
     if report_type == "pages":
         data = [{**d, "name": strip_host(d["name"])} for d in data]
     data = data[:25]
@@ -212,7 +426,7 @@ def run_single(key: str, days: int, report_type: str, as_json: bool) -> None:
         print(json.dumps(data, indent=2))
     else:
         label = "Queries" if report_type == "queries" else "Pages"
-        print(f"\n  Top {label} — last {days} days (since {cutoff})\n")
+        print(f"\n  Top {label} — {period_label(since, until)}\n")
         print_table([label[:-1], "Clicks", "Impr", "CTR%", "Pos"],
                     [[d["name"], d["clicks"], d["impressions"], d["ctr"], d["position"]] for d in data])
         print()
@@ -223,13 +437,28 @@ def main() -> None:
     parser.add_argument("--days", type=int, default=90, help="Look back N days (default 90)")
     parser.add_argument("--type", choices=["queries", "pages", "crawl"], help="Show only one report type")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--history", action="store_true",
+                        help="Sync the local history store and report from it")
+    parser.add_argument("--since", type=date.fromisoformat,
+                        help="Window start, YYYY-MM-DD (overrides --days; implies --history)")
+    parser.add_argument("--until", type=date.fromisoformat,
+                        help="Window end, YYYY-MM-DD (default today; implies --history)")
     args = parser.parse_args()
 
+    until = args.until or date.today()
+    since = args.since or until - timedelta(days=args.days)
+    if since > until:
+        parser.error("--since must not be after --until")
+
     key = load_key()
+    history = None
+    if args.history or args.since or args.until:
+        history = bing_history.BingHistory()
+        sync_history(key, history)
     if args.type:
-        run_single(key, args.days, args.type, args.json)
+        run_single(key, since, until, args.type, args.json, history)
     else:
-        run_summary(key, args.days, args.json)
+        run_summary(key, since, until, args.json, history)
 
 
 if __name__ == "__main__":
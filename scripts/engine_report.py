@@ -0,0 +1,205 @@
+"""Google + Bing side by side for avinashsangle.com.
+
+Replaces running search_console_report.py and bing_report.py separately and merging
+the tables by hand. Both engines are fetched concurrently for the same window, then
+pages and queries are normalized into one key space and hash-joined in a single
+pass over each engine's rows:
+
+  - pages: host and scheme dropped (GSC's sc-domain property reports full URLs,
+    Bing reports against https://avinashsangle.com/), query string and fragment
+    dropped, percent-escapes decoded, trailing slash dropped (the site serves
+    /blog/x; /blog/x/ is a 308 to it),
+  - queries: case-folded, whitespace collapsed.
+
+Each key gets both engines' clicks, impressions and impression-weighted position,
+plus Bing's share of the combined impressions and clicks. The gap list shows keys
+with at least GAP_MIN_IMPRESSIONS on one engine and none on the other.
+
+Usage:
+    python scripts/engine_report.py                 # last 28 days (GSC lag applied to both)
+    python scripts/engine_report.py --days 90 --top 40
+    python scripts/engine_report.py --local --history   # GSC warehouse + Bing history store
+    python scripts/engine_report.py --json
+
+Prerequisites: the credentials of both search_console_report.py and bing_report.py.
+"""
+
+import argparse
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import unquote, urlsplit
+
+import bing_history
+import bing_report
+import search_console_report as gsc
+from gsc_query import Query
+from gsc_warehouse import FINAL_AFTER_DAYS
+
+GOOGLE_ROW_CAP = 1_000_000    # effectively "every row" for this property
+GAP_MIN_IMPRESSIONS = 10
+SITE_HOSTS = ("avinashsangle.com", "www.avinashsangle.com")
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_page(url: str) -> str | None:
+    """Canonical path for a page URL from either engine ("/blog/x"), None if off-site."""
+    parts = urlsplit(url.strip())
+    if parts.netloc and parts.netloc.lower() not in SITE_HOSTS:
+        return None
+    return "/" + unquote(parts.path).strip("/")
+
+
+def normalize_query(query: str) -> str | None:
+    return _SPACE.sub(" ", query).strip().casefold() or None
+
+
+def join(google, bing, normalize) -> dict:
+    """Hash-join (key, clicks, impressions, position) rows of both engines.
+
+    Returns {normalized key: [g_clicks, g_impr, g_pos_weight, b_clicks, b_impr,
+    b_pos_weight]}. Rows that normalize to the same key (e.g. "/x" and "/x/") are
+    summed, positions re-weighted by impressions. One pass per engine.
+    """
+    table: dict = {}
+    for offset, rows in ((0, google), (3, bing)):
+        for key, clicks, impressions, position in rows:
+            norm = normalize(key)
+            if norm is None:
+                continue
+            m = table.get(norm)
+            if m is None:
+                m = table[norm] = [0, 0, 0.0, 0, 0, 0.0]
+            m[offset] += clicks
+            m[offset + 1] += impressions
+            m[offset + 2] += position * impressions
+    return table
+
+
+def _share(part: float, total: float) -> float | None:
+    return round(part / total * 100, 1) if total else None
+
+
+def rows_from_join(table: dict) -> list:
+    out = []
+    for key, (gc, gi, gw, bc, bi, bw) in table.items():
+        out.append({
+            "key": key,
+            "google": {"clicks": int(gc), "impressions": int(gi),
+                       "position": round(gw / gi, 1) if gi else None},
+            "bing": {"clicks": int(bc), "impressions": int(bi),
+                     "position": round(bw / bi, 1) if bi else None},
+            "bing_impression_share": _share(bi, gi + bi),
+            "bing_click_share": _share(bc, gc + bc),
+        })
+    out.sort(key=lambda r: (r["google"]["clicks"] + r["bing"]["clicks"],
+                            r["google"]["impressions"] + r["bing"]["impressions"]), reverse=True)
+    return out
+
+
+def gaps(rows: list) -> list:
+    """Keys with GAP_MIN_IMPRESSIONS+ on one engine and no impressions on the other."""
+    out = []
+    for r in rows:
+        for engine, other in (("google", "bing"), ("bing", "google")):
+            if r[engine]["impressions"] >= GAP_MIN_IMPRESSIONS and not r[other]["impressions"]:
+                out.append({"key": r["key"], "only_on": engine, **r[engine]})
+    out.sort(key=lambda g: g["impressions"], reverse=True)
+    return out
+
+
+def fetch_google(start: str, end: str, local: bool, use_cache: bool) -> dict:
+    """{"query": [...], "page": [...]} as (key, clicks, impressions, position) tuples."""
+    factory, _, site_url, _ = gsc.make_client(start, end, local=local, use_cache=use_cache)
+    base = Query(start, end)
+    fetched = gsc.query_many(site_url, {
+        dim: base.with_dimensions([dim]).limit(GOOGLE_ROW_CAP) for dim in ("query", "page")
+    }, factory)
+    return {dim: [(r["keys"][0], r["clicks"], r["impressions"], r["position"]) for r in rows]
+            for dim, rows in fetched.items()}
+
+
+def fetch_bing(since: date, until: date, history: bool) -> dict:
+    key = bing_report.load_key()
+    store = None
+    if history:
+        store = bing_history.BingHistory()
+        bing_report.sync_history(key, store)
+    # The API window always runs to today; drop rows after until so both engines match.
+    ceiling = bing_report.cutoff_ms(until + timedelta(days=1))
+
+    def consume(rows):
+        bounded = (r for r in rows if (bing_report.ms_date(r.get("Date")) or 0) < ceiling)
+        return [(a["name"], a["clicks"], a["impressions"], a["position"])
+                for a in bing_report.aggregate(bounded, "Query", since)]
+
+    fetched = bing_report.fetch_window(key, {"GetQueryStats": consume, "GetPageStats": consume},
+                                       since, until, store)
+    return {"query": fetched["GetQueryStats"], "page": fetched["GetPageStats"]}
+
+
+def print_side_by_side(title: str, rows: list, top: int) -> None:
+    def num(v):
+        return "-" if v is None else v
+
+    print(f"\n  {title}")
+    gsc.print_table(
+        ["Key", "G clicks", "B clicks", "G impr", "B impr", "B% impr", "B% clicks", "G pos", "B pos"],
+        [[r["key"], r["google"]["clicks"], r["bing"]["clicks"], r["google"]["impressions"],
+          r["bing"]["impressions"], num(r["bing_impression_share"]), num(r["bing_click_share"]),
+          num(r["google"]["position"]), num(r["bing"]["position"])] for r in rows[:top]],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Google + Bing cross-engine report for avinashsangle.com")
+    parser.add_argument("--days", type=int, default=28, help="Look back N days (default 28)")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table (default 25)")
+    parser.add_argument("--local", action="store_true", help="Google side from the local warehouse")
+    parser.add_argument("--history", action="store_true", help="Bing side from the local history store")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the GSC response cache")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    end_date = date.today() - timedelta(days=FINAL_AFTER_DAYS)  # GSC data lag; Bing is cut to match
+    start_date = end_date - timedelta(days=args.days)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        google = pool.submit(fetch_google, str(start_date), str(end_date), args.local, not args.no_cache)
+        bing = pool.submit(fetch_bing, start_date, end_date, args.history)
+        google, bing = google.result(), bing.result()
+
+    report = {"period": {"start": str(start_date), "end": str(end_date)}}
+    for dim, normalize in (("page", normalize_page), ("query", normalize_query)):
+        rows = rows_from_join(join(google[dim], bing[dim], normalize))
+        report[dim] = {"rows": rows, "gaps": gaps(rows)}
+
+    if args.json:
+        for dim in ("page", "query"):
+            report[dim]["rows"] = report[dim]["rows"][:args.top]
+            report[dim]["gaps"] = report[dim]["gaps"][:args.top]
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{'=' * 60}")
+    print(f"  Google + Bing: {start_date} to {end_date}")
+    print(f"  Site: avinashsangle.com  (B% = Bing's share of the combined total)")
+    print(f"{'=' * 60}")
+    print_side_by_side("PAGES", report["page"]["rows"], args.top)
+    print_side_by_side("QUERIES", report["query"]["rows"], args.top)
+
+    print(f"\n  RANKS ON ONE ENGINE ONLY (>= {GAP_MIN_IMPRESSIONS} impressions on it, none on the other)")
+    gap_rows = [dict(g, dim=dim) for dim in ("page", "query") for g in report[dim]["gaps"]]
+    gap_rows.sort(key=lambda g: g["impressions"], reverse=True)
+    gsc.print_table(
+        ["Dim", "Key", "Only on", "Impr", "Clicks", "Pos"],
+        [[g["dim"], g["key"], g["only_on"], g["impressions"], g["clicks"], g["position"]]
+         for g in gap_rows[:args.top]],
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,29 +6,55 @@ previews all load correctly.
 
 Usage:
     python scripts/generate_og_image.py <blog-slug>
-    python scripts/generate_og_image.py --all                 # regenerate all
-    python scripts/generate_og_image.py <blog-slug> --force   # overwrite
+    python scripts/generate_og_image.py --all                 # rebuild out-of-date images
+    python scripts/generate_og_image.py <blog-slug> --force   # rebuild even if up to date
+    python scripts/generate_og_image.py --check               # CI: exit 1 if any image is stale
+    python scripts/generate_og_image.py --kind all --jobs 0   # blog + projects + home, all CPUs
 
 Design:
     1200x630 dark canvas (#1a1b1e)
     Orange accent bar + category label (#ff8f33)
-    Title in Plus Jakarta Sans Bold, wrapped
+    Title in Plus Jakarta Sans Bold, wrapped, shrunk from 64px (down to 40px) to fit
     Author line in bottom-left
     Site URL in top-right
+
+The fonts and everything but the category and title (background, URL, accent bars,
+author block) are prepared once per process in a RenderContext; each image reports
+its render time and the process's peak RSS. --jobs spreads multi-page runs over a
+process pool; log lines still come out in page order.
+
+scripts/og-manifest.json records, per output file, a hash of the image's inputs
+(title, category, theme constants, font file, RENDERER_VERSION). An image is
+rebuilt when it is missing or its hash differs, so a title edit in page.tsx is
+picked up by --all without --force.
+
+Each image is encoded in every variant its extension allows (full and palette PNG;
+lossless and lossy WebP; AVIF when Pillow has it) and the smallest one within
+MAX_DIFF_RMS of the rendered pixels is written. The extension itself always comes
+from the openGraph URL in page.tsx.
 """
 
 import argparse
+import hashlib
+import io
+import json
+import os
 import re
+import resource
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageStat, features
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 BLOG_ROOT = REPO_ROOT / "src" / "app" / "blog"
 PROJECTS_ROOT = REPO_ROOT / "src" / "app" / "projects"
 PUBLIC_ROOT = REPO_ROOT / "public"
 FONT_PATH = REPO_ROOT / "scripts" / "assets" / "fonts" / "PlusJakartaSans-Bold.ttf"
+MANIFEST_PATH = REPO_ROOT / "scripts" / "og-manifest.json"
+RENDERER_VERSION = 3   # bump whenever RenderContext's drawing changes, to invalidate every image
 
 # Theme (matches the site's dark accent palette)
 BG = (26, 27, 30)            # #1a1b1e
@@ -38,6 +64,41 @@ MUTED = (160, 160, 160)
 
 WIDTH, HEIGHT = 1200, 630
 MARGIN = 80
+FONT_SIZES = {"category": 24, "url": 22, "title": 64, "author_name": 28, "author_role": 20}
+TITLE_MIN_SIZE = 40      # long titles shrink from FONT_SIZES["title"] down to this
+TITLE_MAX_LINES = 5
+TITLE_MAX_HEIGHT = 360   # px between the category row and the author block (4 lines at 64)
+
+# Encoding: every candidate for the output's extension is tried, and the smallest one
+# within MAX_DIFF_RMS of the rendered pixels is written. MAX_BYTES only flags images
+# that are still too big.
+MAX_BYTES = 50_000       # per-image budget, overridable with --max-bytes
+MAX_DIFF_RMS = 1.5       # worst channel's RMS pixel difference (0-255) a candidate may have
+ENCODINGS = {            # extension -> [(label, palette colors or None, save kwargs)]; the first
+                         # variant is always acceptable, so every image gets an encoding
+    ".png": [
+        ("PNG", None, {"format": "PNG", "optimize": True}),
+        ("PNG 256 colors", 256, {"format": "PNG", "optimize": True}),
+        ("PNG 64 colors", 64, {"format": "PNG", "optimize": True}),
+        ("PNG 16 colors", 16, {"format": "PNG", "optimize": True}),
+    ],
+    ".webp": [
+        ("WebP lossless", None, {"format": "WEBP", "lossless": True, "method": 6}),
+        ("WebP 90", None, {"format": "WEBP", "quality": 90, "method": 6}),
+        ("WebP 80", None, {"format": "WEBP", "quality": 80, "method": 6}),
+    ],
+}
+if features.check("avif"):
+    ENCODINGS[".avif"] = [   # 4:4:4: subsampled chroma smears the orange category text
+        ("AVIF 90", None, {"format": "AVIF", "quality": 90, "subsampling": "4:4:4"}),
+        ("AVIF 80", None, {"format": "AVIF", "quality": 80, "subsampling": "4:4:4"}),
+        ("AVIF 60", None, {"format": "AVIF", "quality": 60, "subsampling": "4:4:4"}),
+    ]
+
+SITE_URL = "avinashsangle.com"
+AUTHOR_NAME = "Avinash Sangle"
+AUTHOR_ROLE = "Claude Code & AI Engineering"
+HOME_TITLE = "Avinash Sangle - AI Automation & DevOps Engineer"
 
 
 def extract_from_tsx(page_tsx: Path) -> dict:
@@ -71,112 +132,372 @@ def extract_from_tsx(page_tsx: Path) -> dict:
     return {"title": title, "category": category, "og_filename": og_filename}
 
 
-def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
-    words = text.split()
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, measure=None) -> list[str]:
+    """Greedy word wrap in one pass: each word and the space are measured once.
+
+    Line widths are sums of advance widths (font.getlength), which for this font
+    match the rendered line's extent. measure defaults to font.getlength; pass a
+    caching one to reuse widths across calls.
+    """
+    measure = measure or font.getlength
+    space = measure(" ")
     lines: list[str] = []
     current: list[str] = []
-    for word in words:
-        trial = " ".join(current + [word])
-        bbox = font.getbbox(trial)
-        if bbox[2] - bbox[0] <= max_width:
-            current.append(word)
+    width = 0.0
+    for word in text.split():
+        word_width = measure(word)
+        if current and width + space + word_width > max_width:
+            lines.append(" ".join(current))
+            current, width = [word], word_width
         else:
-            if current:
-                lines.append(" ".join(current))
-            current = [word]
+            width += (space if current else 0) + word_width
+            current.append(word)
     if current:
         lines.append(" ".join(current))
     return lines
 
 
-def render(title: str, category: str, output_path: Path) -> None:
-    img = Image.new("RGB", (WIDTH, HEIGHT), BG)
-    draw = ImageDraw.Draw(img)
-
-    # Fonts
-    font_category = ImageFont.truetype(str(FONT_PATH), 24)
-    font_url = ImageFont.truetype(str(FONT_PATH), 22)
-    font_title = ImageFont.truetype(str(FONT_PATH), 64)
-    font_author_name = ImageFont.truetype(str(FONT_PATH), 28)
-    font_author_role = ImageFont.truetype(str(FONT_PATH), 20)
-
-    # Top-right: site URL
-    site_url = "avinashsangle.com"
-    bbox = font_url.getbbox(site_url)
-    url_width = bbox[2] - bbox[0]
-    draw.text((WIDTH - MARGIN - url_width, MARGIN), site_url, font=font_url, fill=MUTED)
-
-    # Top-left: accent bar + category
-    bar_y = MARGIN + 8
-    draw.rectangle([MARGIN, bar_y, MARGIN + 48, bar_y + 4], fill=ACCENT)
-    draw.text((MARGIN + 64, MARGIN), category, font=font_category, fill=ACCENT)
-
-    # Title block - vertically centered
-    available_width = WIDTH - 2 * MARGIN
-    lines = wrap_text(title, font_title, available_width)
-    # Limit to 4 lines, ellipsis if longer
-    if len(lines) > 4:
-        lines = lines[:4]
-        lines[-1] = lines[-1].rstrip() + "..."
-
-    # Compute line height
-    ascent, descent = font_title.getmetrics()
-    line_height = ascent + descent + 8
-    total_title_height = line_height * len(lines)
-    title_start_y = (HEIGHT - total_title_height) // 2 - 20
-
-    for i, line in enumerate(lines):
-        draw.text((MARGIN, title_start_y + i * line_height), line, font=font_title, fill=FG)
-
-    # Bottom-left: author block
-    author_y = HEIGHT - MARGIN - 72
-    draw.rectangle([MARGIN, author_y, MARGIN + 64, author_y + 3], fill=ACCENT)
-    draw.text((MARGIN, author_y + 14), "Avinash Sangle", font=font_author_name, fill=FG)
-    draw.text((MARGIN, author_y + 48), "Claude Code & AI Engineering", font=font_author_role, fill=MUTED)
+def line_height(font: ImageFont.FreeTypeFont) -> int:
+    ascent, descent = font.getmetrics()
+    return ascent + descent + 8
+
+
+def _diff_rms(a: Image.Image, b: Image.Image) -> float:
+    return max(ImageStat.Stat(ImageChops.difference(a, b.convert("RGB"))).rms)
+
+
+def encode(img: Image.Image, output_path: Path, max_bytes: int = MAX_BYTES) -> dict:
+    """Write the smallest acceptable encoding of img for output_path's extension.
+
+    The extension is fixed by the openGraph URL in page.tsx, so only its format's
+    variants compete. Returns {"label", "bytes", "baseline", "over_budget"}, where
+    baseline is the size of the plain optimize=True PNG this script used to write.
+    """
+    best = baseline = None
+    for i, (label, colors, kwargs) in enumerate(ENCODINGS[output_path.suffix.lower()]):
+        candidate = img
+        if colors:
+            candidate = img.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        buf = io.BytesIO()
+        candidate.save(buf, **kwargs)
+        data = buf.getvalue()
+        if label == "PNG":
+            baseline = len(data)
+        lossless = colors is None and (kwargs["format"] == "PNG" or kwargs.get("lossless"))
+        if i and not lossless:
+            decoded = candidate if colors else Image.open(io.BytesIO(data))
+            if _diff_rms(img, decoded) > MAX_DIFF_RMS:
+                continue
+        if best is None or len(data) < len(best[1]):
+            best = (label, data)
+    if baseline is None:
+        buf = io.BytesIO()
+        img.save(buf, "PNG", optimize=True)
+        baseline = len(buf.getvalue())
+    output_path.write_bytes(best[1])
+    return {"label": best[0], "bytes": len(best[1]), "baseline": baseline,
+            "over_budget": len(best[1]) > max_bytes}
+
+
+class RenderContext:
+    """Fonts and the static base layer, built once and reused for every image.
+
+    Everything except the category label and the title is identical across images,
+    so it is drawn once into base; render() copies that and draws just the two texts.
+    """
+
+    def __init__(self, font_path: Path = FONT_PATH):
+        self.font_path = font_path
+        self.fonts = {name: ImageFont.truetype(str(font_path), size) for name, size in FONT_SIZES.items()}
+        self.title_fonts = {FONT_SIZES["title"]: self.fonts["title"]}
+        self.widths: dict = {}   # title size -> {word or " ": advance width}
+        self.base = self._base_layer()
+
+    def _base_layer(self) -> Image.Image:
+        img = Image.new("RGB", (WIDTH, HEIGHT), BG)
+        draw = ImageDraw.Draw(img)
+
+        # Top-right: site URL
+        bbox = self.fonts["url"].getbbox(SITE_URL)
+        url_width = bbox[2] - bbox[0]
+        draw.text((WIDTH - MARGIN - url_width, MARGIN), SITE_URL, font=self.fonts["url"], fill=MUTED)
+
+        # Top-left: accent bar (the category label goes next to it)
+        bar_y = MARGIN + 8
+        draw.rectangle([MARGIN, bar_y, MARGIN + 48, bar_y + 4], fill=ACCENT)
+
+        # Bottom-left: author block
+        author_y = HEIGHT - MARGIN - 72
+        draw.rectangle([MARGIN, author_y, MARGIN + 64, author_y + 3], fill=ACCENT)
+        draw.text((MARGIN, author_y + 14), AUTHOR_NAME, font=self.fonts["author_name"], fill=FG)
+        draw.text((MARGIN, author_y + 48), AUTHOR_ROLE, font=self.fonts["author_role"], fill=MUTED)
+        return img
+
+    def title_font(self, size: int) -> ImageFont.FreeTypeFont:
+        font = self.title_fonts.get(size)
+        if font is None:
+            font = self.title_fonts[size] = ImageFont.truetype(str(self.font_path), size)
+        return font
+
+    def _wrap(self, title: str, size: int) -> list[str]:
+        font = self.title_font(size)
+        widths = self.widths.setdefault(size, {})
+
+        def measure(text: str) -> float:
+            width = widths.get(text)
+            if width is None:
+                width = widths[text] = font.getlength(text)
+            return width
+
+        return wrap_text(title, font, WIDTH - 2 * MARGIN, measure)
+
+    def _fits(self, lines: list, size: int) -> bool:
+        return (len(lines) <= TITLE_MAX_LINES
+                and len(lines) * line_height(self.title_font(size)) <= TITLE_MAX_HEIGHT)
+
+    def layout_title(self, title: str) -> tuple:
+        """(font, lines) at the largest size from TITLE_MIN_SIZE up to the title size
+        whose wrap fits the line and height budget, found by binary search.
+
+        A title too long even at TITLE_MIN_SIZE is cut with "..." at that size.
+        """
+        lo, hi = TITLE_MIN_SIZE, FONT_SIZES["title"]
+        best = None
+        while lo <= hi:
+            size = (lo + hi) // 2
+            lines = self._wrap(title, size)
+            if self._fits(lines, size):
+                best, lo = (size, lines), size + 1
+            else:
+                hi = size - 1
+        if best is None:
+            size = TITLE_MIN_SIZE
+            font = self.title_font(size)
+            keep = min(TITLE_MAX_LINES, TITLE_MAX_HEIGHT // line_height(font))
+            lines = self._wrap(title, size)[:keep]
+            lines[-1] = lines[-1].rstrip() + "..."
+            best = (size, lines)
+        return self.title_font(best[0]), best[1]
+
+    def render(self, title: str, category: str, output_path: Path, max_bytes: int = MAX_BYTES) -> tuple:
+        """Render one image to output_path; return (seconds, encode() stats)."""
+        started = time.perf_counter()
+        img = self.base.copy()
+        draw = ImageDraw.Draw(img)
+
+        draw.text((MARGIN + 64, MARGIN), category, font=self.fonts["category"], fill=ACCENT)
+
+        # Title block - auto-fit, vertically centered
+        font_title, lines = self.layout_title(title)
+        step = line_height(font_title)
+        title_start_y = (HEIGHT - step * len(lines)) // 2 - 20
+
+        for i, line in enumerate(lines):
+            draw.text((MARGIN, title_start_y + i * step), line, font=font_title, fill=FG)
+
+        encoded = encode(img, output_path, max_bytes)
+        return time.perf_counter() - started, encoded
+
+
+_context: RenderContext | None = None
+
+
+def get_context() -> RenderContext:
+    """The process-wide RenderContext, built on first use (once per pool worker)."""
+    global _context
+    if _context is None:
+        _context = RenderContext()
+    return _context
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024   # bytes on macOS, KiB on Linux
+
+
+def render(title: str, category: str, output_path: Path, max_bytes: int = MAX_BYTES) -> tuple:
+    return get_context().render(title, category, output_path, max_bytes)
+
+
+_font_digest: str | None = None
+
+
+def input_hash(title: str, category: str, output_name: str) -> str:
+    """Hash of everything an image is rendered from: title, category, theme, font,
+    encoder settings for the output's format, renderer."""
+    global _font_digest
+    if _font_digest is None:
+        _font_digest = hashlib.sha256(FONT_PATH.read_bytes()).hexdigest()
+    inputs = {
+        "title": title,
+        "category": category,
+        "theme": [BG, FG, ACCENT, MUTED, WIDTH, HEIGHT, MARGIN, FONT_SIZES, SITE_URL, AUTHOR_NAME, AUTHOR_ROLE,
+                  TITLE_MIN_SIZE, TITLE_MAX_LINES, TITLE_MAX_HEIGHT],
+        "encoding": [MAX_DIFF_RMS, ENCODINGS.get(Path(output_name).suffix.lower())],
+        "font": _font_digest,
+        "renderer": RENDERER_VERSION,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_manifest() -> dict:
+    """{output filename: input_hash} of the images last rendered."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def save_manifest(manifest: dict, results: list) -> None:
+    """Record the hashes of the jobs in results that were rendered."""
+    rendered = {job["output"].name: job["hash"] for job, (_, seconds, *_) in results if seconds is not None}
+    if rendered:
+        manifest.update(rendered)
+        MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _plan(label: str, output_path: Path, title: str, category: str, force: bool, manifest: dict,
+          max_bytes: int) -> dict:
+    job = {"label": label, "output": output_path, "title": title, "category": category,
+           "hash": input_hash(title, category, output_path.name), "max_bytes": max_bytes}
+    recorded = manifest.get(output_path.name)
+    if output_path.suffix.lower() not in ENCODINGS:
+        job["skip"] = (f"can't encode {output_path.name}: openGraph image must be one of "
+                       f"{', '.join(ENCODINGS)}")
+    elif not output_path.exists():
+        job["reason"] = "missing"
+    elif recorded is None:
+        job["reason"] = "not in manifest"
+    elif recorded != job["hash"]:
+        job["reason"] = "inputs changed"
+    elif force:
+        job["reason"] = "forced"
+    else:
+        job["skip"] = f"up to date at {output_path.name} (use --force to rebuild)"
+    return job
 
-    img.save(output_path, "PNG", optimize=True)
 
+def plan_slug(slug: str, kind: str = "blog", force: bool = False, manifest: dict | None = None,
+              max_bytes: int = MAX_BYTES) -> dict:
+    """Describe the image for one page without rendering it.
 
-def generate_for_slug(slug: str, kind: str = "blog", force: bool = False) -> Path | None:
+    Returns {"label", "output", "title", "category", "hash"} plus either "reason"
+    (why it needs rendering) or "skip" (why not; "output" is None if page.tsx is
+    missing). Only page.tsx is read, so planning every page is fast.
+    """
     root = BLOG_ROOT if kind == "blog" else PROJECTS_ROOT
     page_tsx = root / slug / "page.tsx"
     if not page_tsx.exists():
-        print(f"  [{slug}] page.tsx not found at {page_tsx}, skipping")
-        return None
+        return {"label": slug, "output": None, "skip": f"page.tsx not found at {page_tsx}, skipping"}
 
     meta = extract_from_tsx(page_tsx)
     # Prefix project images so the filename namespace is clear
     if kind == "project" and not meta["og_filename"].startswith("og-project-"):
         meta["og_filename"] = f"og-project-{slug}.png"
 
-    output_path = PUBLIC_ROOT / meta["og_filename"]
-
-    if output_path.exists() and not force:
-        print(f"  [{slug}] already exists at {output_path.name} (use --force to overwrite)")
-        return output_path
-
     # Override category for project pages if extraction returned the default
     category = meta["category"]
     if kind == "project" and category == "ARTICLE":
         category = "PROJECT"
 
-    render(meta["title"], category, output_path)
-    print(f"  [{slug}] -> public/{meta['og_filename']}  (category: {category})")
-    return output_path
+    return _plan(slug, PUBLIC_ROOT / meta["og_filename"], meta["title"], category, force,
+                 load_manifest() if manifest is None else manifest, max_bytes)
 
 
-def generate_home(force: bool = False) -> Path | None:
-    output_path = PUBLIC_ROOT / "og-home.png"
-    if output_path.exists() and not force:
-        print(f"  [home] already exists at {output_path.name} (use --force to overwrite)")
-        return output_path
-    render(
-        "Avinash Sangle - AI Automation & DevOps Engineer",
-        "PORTFOLIO",
-        output_path,
-    )
-    print(f"  [home] -> public/og-home.png  (category: PORTFOLIO)")
-    return output_path
+def plan_home(force: bool = False, manifest: dict | None = None, max_bytes: int = MAX_BYTES) -> dict:
+    return _plan("home", PUBLIC_ROOT / "og-home.png", HOME_TITLE, "PORTFOLIO", force,
+                 load_manifest() if manifest is None else manifest, max_bytes)
+
+
+def plan_sections(kinds: list, force: bool, manifest: dict, max_bytes: int = MAX_BYTES) -> list:
+    """Jobs for every page of kinds ("blog", "project", "home"), in a fixed order."""
+    jobs = []
+    for kind in kinds:
+        if kind == "home":
+            jobs.append(plan_home(force, manifest, max_bytes))
+            continue
+        root = BLOG_ROOT if kind == "blog" else PROJECTS_ROOT
+        slugs = [p.name for p in sorted(root.iterdir()) if (p / "page.tsx").exists()]
+        jobs += [plan_slug(slug, kind, force, manifest, max_bytes) for slug in slugs]
+    return jobs
+
+
+def run_job(job: dict) -> tuple:
+    """Render a planned image; return (log line, seconds or None if skipped, peak RSS bytes,
+    bytes saved against a plain PNG, over budget).
+
+    Runs in pool workers, so it returns its log line instead of printing it.
+    """
+    if "skip" in job:
+        return f"  [{job['label']}] {job['skip']}", None, peak_rss(), 0, False
+    seconds, encoded = render(job["title"], job["category"], job["output"], job["max_bytes"])
+    rss = peak_rss()
+    saved = encoded["baseline"] - encoded["bytes"]
+    budget = "; OVER BUDGET" if encoded["over_budget"] else ""
+    line = (f"  [{job['label']}] -> public/{job['output'].name}  ({job['reason']}; category: {job['category']}; "
+            f"{encoded['label']} {encoded['bytes'] / 1024:.0f} KiB, {saved / 1024:.0f} KiB saved{budget}; "
+            f"{seconds * 1000:.0f} ms, peak RSS {rss / 1024 / 1024:.0f} MiB)")
+    return line, seconds, rss, saved, encoded["over_budget"]
+
+
+def _generate(job: dict, manifest: dict) -> Path | None:
+    result = run_job(job)
+    print(result[0])
+    save_manifest(manifest, [(job, result)])
+    return job["output"]
+
+
+def generate_for_slug(slug: str, kind: str = "blog", force: bool = False,
+                      max_bytes: int = MAX_BYTES) -> Path | None:
+    manifest = load_manifest()
+    return _generate(plan_slug(slug, kind, force, manifest, max_bytes), manifest)
+
+
+def generate_home(force: bool = False, max_bytes: int = MAX_BYTES) -> Path | None:
+    manifest = load_manifest()
+    return _generate(plan_home(force, manifest, max_bytes), manifest)
+
+
+def run_jobs(jobs: list, workers: int) -> list:
+    """Run jobs, printing each log line in job order; return [(job, run_job result)].
+
+    With workers > 1 the renders are spread over a process pool. Each worker builds
+    its own RenderContext once, and results are printed in submission order, so the
+    output matches a serial run.
+    """
+    if workers <= 1 or sum("skip" not in j for j in jobs) <= 1:
+        results = []
+        for job in jobs:
+            results.append((job, run_job(job)))
+            print(results[-1][1][0])
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=get_context) as pool:
+        for job, result in zip(jobs, pool.map(run_job, jobs)):
+            results.append((job, result))
+            print(result[0])
+    return results
+
+
+def print_run_stats(stages: list, results: list, workers: int, max_bytes: int = MAX_BYTES) -> None:
+    """Per-stage wall time, render throughput, bytes saved and peak RSS for a multi-page run."""
+    rendered = [seconds for _, (_, seconds, *_) in results if seconds is not None]
+    print(f"\n  Timings ({workers} worker(s))")
+    for name, seconds in stages:
+        print(f"  {name:<10} {seconds * 1000:9.1f} ms")
+    print(f"  {'total':<10} {sum(seconds for _, seconds in stages) * 1000:9.1f} ms")
+    render_wall = dict(stages).get("render", 0.0)
+    if rendered and render_wall:
+        busy = sum(rendered)
+        print(f"  {len(rendered)} image(s) rendered, {len(results) - len(rendered)} skipped: "
+              f"{len(rendered) / render_wall:.1f} images/s, {busy / len(rendered) * 1000:.0f} ms/image, "
+              f"{busy / render_wall:.1f} renders in flight on average")
+        saved = sum(result[3] for _, result in results)
+        over = sum(result[4] for _, result in results)
+        print(f"  {saved / 1024:.0f} KiB saved against plain PNGs; "
+              f"{over} image(s) over the {max_bytes:,}-byte budget")
+    print(f"  peak RSS {max(result[2] for _, result in results) / 1024 / 1024:.0f} MiB per process")
 
 
 def main() -> None:
@@ -184,36 +505,61 @@ def main() -> None:
     parser.add_argument("slug", nargs="?")
     parser.add_argument(
         "--kind",
-        choices=["blog", "project", "home"],
+        choices=["blog", "project", "home", "all"],
         default="blog",
-        help="Which section the slug belongs to (default: blog). Use --kind home to generate the homepage OG.",
+        help="Which section the slug belongs to (default: blog). Use --kind home to generate the homepage OG, "
+             "--kind all for every blog, project and home image.",
     )
     parser.add_argument("--all", action="store_true", help="Generate for every page in the chosen section")
     parser.add_argument("--force", action="store_true", help="Overwrite existing images")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Render in N worker processes (default 1; 0 = one per CPU)")
+    parser.add_argument("--max-bytes", type=int, default=MAX_BYTES,
+                        help=f"Flag images encoded larger than this (default {MAX_BYTES})")
+    parser.add_argument("--check", action="store_true",
+                        help="Render nothing; exit non-zero if any blog, project or home image is out of date")
     args = parser.parse_args()
 
     if not FONT_PATH.exists():
         sys.exit(f"Font missing: {FONT_PATH}. Re-download Plus Jakarta Sans.")
 
+    if args.check:
+        stale = [job for job in plan_sections(["blog", "project", "home"], False, load_manifest())
+                 if "reason" in job]
+        for job in stale:
+            print(f"  [{job['label']}] public/{job['output'].name}: {job['reason']}")
+        if stale:
+            sys.exit(f"{len(stale)} OG image(s) out of date; run: python scripts/generate_og_image.py --kind all")
+        print("All OG images are up to date.")
+        return
+
     PUBLIC_ROOT.mkdir(exist_ok=True)
 
     if args.kind == "home":
-        generate_home(force=args.force)
+        generate_home(force=args.force, max_bytes=args.max_bytes)
         return
 
-    root = BLOG_ROOT if args.kind == "blog" else PROJECTS_ROOT
-
-    if args.all:
-        slugs = [p.name for p in sorted(root.iterdir()) if (p / "page.tsx").exists()]
-        print(f"Generating OG images for {len(slugs)} {args.kind} pages:")
-        for slug in slugs:
-            generate_for_slug(slug, kind=args.kind, force=args.force)
+    if args.all or args.kind == "all":
+        workers = args.jobs or os.cpu_count() or 1
+        started = time.perf_counter()
+        sections = ["blog", "project", "home"] if args.kind == "all" else [args.kind]
+        manifest = load_manifest()
+        jobs = plan_sections(sections, args.force, manifest, args.max_bytes)
+        stages = [("scan", time.perf_counter() - started)]
+
+        stale = sum("reason" in job for job in jobs)
+        print(f"Generating OG images for {len(jobs)} {' + '.join(sections)} pages ({stale} to render):")
+        started = time.perf_counter()
+        results = run_jobs(jobs, workers)
+        stages.append(("render", time.perf_counter() - started))
+        save_manifest(manifest, results)
+        print_run_stats(stages, results, workers, args.max_bytes)
         return
 
     if not args.slug:
-        sys.exit("Provide a slug, or --all, or --kind home")
+        sys.exit("Provide a slug, or --all, or --kind home / --kind all")
 
-    generate_for_slug(args.slug, kind=args.kind, force=args.force)
+    generate_for_slug(args.slug, kind=args.kind, force=args.force, max_bytes=args.max_bytes)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+"""Search Console API client factory shared by search_console_report.py and request_indexing.py.
+
+Startup used to be dominated by work that does not change between runs:
+importing googleapiclient, parsing the discovery document, and minting a fresh
+service-account access token. This module:
+
+  - imports google-auth / googleapiclient lazily, on the first get_service() call,
+  - builds the client from a disk-cached discovery document (seeded from the copy
+    bundled with googleapiclient, or fetched once if that is missing),
+  - persists the OAuth access token in scripts/.cache/ (mode 0600) and reuses it
+    until TOKEN_MARGIN before expiry,
+  - records how long each stage took, for the scripts' --timings flag.
+
+Delete scripts/.cache/google-*.json to force a fresh token / discovery document.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CREDS_PATH = REPO_ROOT / "scripts" / "credentials" / "gsc-service-account.json"
+CACHE_DIR = REPO_ROOT / "scripts" / ".cache"
+API, VERSION = "searchconsole", "v1"
+DISCOVERY_PATH = CACHE_DIR / f"google-discovery-{API}-{VERSION}.json"
+DISCOVERY_URL = f"https://{API}.googleapis.com/$discovery/rest?version={VERSION}"
+TOKEN_MARGIN = timedelta(minutes=5)
+
+_STARTED = time.perf_counter()
+timings: list = []   # (stage, seconds), in order
+
+
+class _Stage:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        timings.append((self.name, time.perf_counter() - self.start))
+
+
+def _write_atomic(path: Path, text: str, mode: int = 0o644) -> None:
+    """Write text to path via a temp file and os.replace, so a concurrent reader (the
+    scripts build clients from worker threads) sees the old file or the new, never half."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, "w") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+def _discovery_document() -> str:
+    if DISCOVERY_PATH.exists():
+        return DISCOVERY_PATH.read_text()
+    from googleapiclient import discovery_cache
+
+    doc = discovery_cache.get_static_doc(API, VERSION)
+    if doc is None:
+        import urllib.request
+
+        with urllib.request.urlopen(DISCOVERY_URL, timeout=30) as resp:
+            doc = resp.read().decode("utf-8")
+    _write_atomic(DISCOVERY_PATH, doc)
+    return doc
+
+
+def _token_path(client_email: str, scopes: list) -> Path:
+    digest = hashlib.sha256(f"{client_email} {' '.join(sorted(scopes))}".encode()).hexdigest()[:12]
+    return CACHE_DIR / f"google-token-{digest}.json"
+
+
+def _load_token(creds, path: Path) -> bool:
+    """Attach a cached, still-valid token to creds; False if none is usable."""
+    if not path.exists():
+        return False
+    try:
+        data = json.loads(path.read_text())
+        expiry = datetime.fromisoformat(data["expiry"])
+    except (json.JSONDecodeError, KeyError, ValueError):
+        return False
+    if expiry - TOKEN_MARGIN <= datetime.now(timezone.utc):
+        return False
+    creds.token = data["token"]
+    creds.expiry = expiry.replace(tzinfo=None)  # google-auth compares naive UTC datetimes
+    return True
+
+
+def _save_token(creds, path: Path) -> None:
+    expiry = creds.expiry.replace(tzinfo=timezone.utc)
+    _write_atomic(path, json.dumps({"token": creds.token, "expiry": expiry.isoformat()}), 0o600)
+
+
+def get_service(scopes: list, creds_path: Path = CREDS_PATH):
+    """Return a Search Console v1 client authorised for scopes."""
+    if not creds_path.exists():
+        sys.exit(f"Credentials not found: {creds_path}")
+
+    with _Stage("import google libraries"):
+        import google.auth.transport.requests
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build_from_document
+
+    with _Stage("load credentials"):
+        creds = service_account.Credentials.from_service_account_file(
+            str(creds_path), scopes=scopes
+        )
+        token_path = _token_path(creds.service_account_email, scopes)
+
+    with _Stage("access token"):
+        if not _load_token(creds, token_path):
+            creds.refresh(google.auth.transport.requests.Request())
+            _save_token(creds, token_path)
+
+    with _Stage("build client"):
+        service = build_from_document(_discovery_document(), credentials=creds)
+    return service
+
+
+def print_timings() -> None:
+    """Print per-stage startup timings (aggregated when several clients were built)."""
+    totals: dict = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    print("\n  Startup timings")
+    for name, seconds in totals.items():
+        print(f"  {name:<24} {seconds * 1000:8.1f} ms")
+    print(f"  {'total since start':<24} {(time.perf_counter() - _STARTED) * 1000:8.1f} ms")
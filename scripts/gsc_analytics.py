@@ -0,0 +1,133 @@
+"""Vectorized analytics over the local Search Console warehouse (gsc_warehouse.py).
+
+Daily query or page rows are loaded once into NumPy columns: day offset, key code,
+clicks, impressions, and position x impressions. Every metric below is then a masked
+np.bincount over key codes, or a cumulative sum along a keys x days matrix. Comparing
+two periods across hundreds of thousands of query/day rows is a few vectorized
+passes, not a Python loop or a spreadsheet.
+
+    compare()       per-key clicks, impressions, CTR and impression-weighted position
+                    for two windows, with deltas, sorted by biggest click movement
+    daily()         a keys x days matrix of one metric
+    rolling_mean()  trailing N-day average along the day axis
+    zscores()       each day against the mean/std of the N days before it (anomalies)
+"""
+
+import sqlite3
+
+import numpy as np
+
+GRAINS = {"query": "query_daily", "page": "page_daily"}
+
+
+class Columns:
+    """Columnar view of one warehouse grain over [start, end]."""
+
+    def __init__(self, start: str, ndays: int, labels: list, code, day, clicks, impressions, pos_weight):
+        self.start = start
+        self.ndays = ndays
+        self.labels = labels          # key code -> query/page string
+        self.code = code              # int64 per row
+        self.day = day                # int32 per row, 0 = start
+        self.clicks = clicks          # float64 per row
+        self.impressions = impressions
+        self.pos_weight = pos_weight  # position * impressions, so sums re-weight correctly
+
+    def offset(self, iso_day: str) -> int:
+        return int((np.datetime64(iso_day) - np.datetime64(self.start)).astype(int))
+
+
+def load(db: sqlite3.Connection, dim: str, start: str, end: str) -> Columns:
+    """Load the dim ("query" or "page") daily rows for [start, end] into arrays."""
+    rows = db.execute(
+        f"SELECT date, {dim}, clicks, impressions, position * impressions FROM {GRAINS[dim]} "
+        "WHERE date BETWEEN ? AND ?", (start, end)).fetchall()
+    ndays = int((np.datetime64(end) - np.datetime64(start)).astype(int)) + 1
+    if not rows:
+        empty = np.zeros(0)
+        return Columns(start, ndays, [], empty.astype(np.int64), empty.astype(np.int32),
+                       empty, empty, empty)
+
+    dates, keys, clicks, impressions, pos_weight = zip(*rows)
+    # Hash-factorize keys in one pass (np.unique on strings would sort them).
+    index: dict = {}
+    code = np.fromiter((index.setdefault(k, len(index)) for k in keys), np.int64, len(keys))
+    day = (np.array(dates, dtype="datetime64[D]") - np.datetime64(start)).astype(np.int32)
+    return Columns(start, ndays, list(index), code, day,
+                   np.array(clicks, dtype=np.float64), np.array(impressions, dtype=np.float64),
+                   np.array(pos_weight, dtype=np.float64))
+
+
+def _period(cols: Columns, start: str, end: str) -> tuple:
+    mask = (cols.day >= cols.offset(start)) & (cols.day <= cols.offset(end))
+    k, codes = len(cols.labels), cols.code[mask]
+    clicks = np.bincount(codes, weights=cols.clicks[mask], minlength=k)
+    impressions = np.bincount(codes, weights=cols.impressions[mask], minlength=k)
+    pos_weight = np.bincount(codes, weights=cols.pos_weight[mask], minlength=k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ctr = np.where(impressions > 0, clicks / impressions, np.nan)
+        position = np.where(impressions > 0, pos_weight / impressions, np.nan)
+    return clicks, impressions, ctr, position
+
+
+def compare(cols: Columns, current: tuple, previous: tuple) -> dict:
+    """Per-key metrics for the current and previous (start, end) windows, plus deltas.
+
+    Returns a dict of equal-length arrays (and "key" labels), sorted by absolute click
+    change, then absolute impression change. CTR and position are NaN for a key with
+    no impressions in a window, so its deltas are NaN too. A positive position delta
+    means the key ranks worse.
+    """
+    cur, prev = _period(cols, *current), _period(cols, *previous)
+    out = {}
+    for i, metric in enumerate(("clicks", "impressions", "ctr", "position")):
+        out[metric] = cur[i]
+        out[f"{metric}_prev"] = prev[i]
+        out[f"{metric}_delta"] = cur[i] - prev[i]
+    order = np.lexsort((-np.abs(out["impressions_delta"]), -np.abs(out["clicks_delta"])))
+    result = {name: values[order] for name, values in out.items()}
+    result["key"] = [cols.labels[i] for i in order]
+    return result
+
+
+def daily(cols: Columns, metric: str, keys) -> np.ndarray:
+    """A len(keys) x ndays matrix of metric ("clicks" or "impressions") per key code."""
+    slot = np.full(len(cols.labels), -1, dtype=np.int64)
+    slot[keys] = np.arange(len(keys))
+    rows = slot[cols.code]
+    keep = rows >= 0
+    flat = rows[keep] * cols.ndays + cols.day[keep]
+    values = getattr(cols, metric)[keep]
+    return np.bincount(flat, weights=values, minlength=len(keys) * cols.ndays).reshape(len(keys), cols.ndays)
+
+
+def _window_sums(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Sums over [t - window + 1, t] for every column t (NaN until a full window exists)."""
+    padded = np.concatenate([np.zeros((matrix.shape[0], 1)), np.cumsum(matrix, axis=1)], axis=1)
+    sums = np.full(matrix.shape, np.nan)
+    sums[:, window - 1:] = padded[:, window:] - padded[:, :-window]
+    return sums
+
+
+def rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window-day average along the day axis."""
+    return _window_sums(matrix, window) / window
+
+
+def zscores(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Z-score of each day against the window days before it (NaN without a baseline).
+
+    Days whose baseline is flat (std 0) score 0 when unchanged and ±inf otherwise.
+    """
+    sums = _window_sums(matrix, window)
+    squares = _window_sums(matrix * matrix, window)
+    # Shift by one day so the baseline for day t is t - window .. t - 1.
+    base_sum = np.full(matrix.shape, np.nan)
+    base_sq = np.full(matrix.shape, np.nan)
+    base_sum[:, 1:], base_sq[:, 1:] = sums[:, :-1], squares[:, :-1]
+    mean = base_sum / window
+    std = np.sqrt(np.maximum(base_sq / window - mean * mean, 0.0))
+    diff = matrix - mean
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(std > 0, diff / std, np.where(diff == 0, 0.0, np.sign(diff) * np.inf))
+    return np.where(np.isnan(mean), np.nan, z)
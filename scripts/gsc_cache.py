@@ -0,0 +1,203 @@
+"""Disk cache for Search Console API responses, used by search_console_report.py.
+
+A searchanalytics.query request whose endDate is past Google's finalization lag
+returns the same rows forever, so polling the report (dashboards run --json on a
+schedule) should not pay API latency each time. CachingService wraps a client and
+answers searchanalytics().query(...).execute() and sites().list().execute() from
+scripts/.cache/gsc-responses.sqlite when it can:
+
+  - key: sha256 of siteUrl + the canonicalized request body (sorted keys, filters
+    in a fixed order, defaults such as startRow 0 and type "web" dropped), so
+    equivalent requests share an entry,
+  - requests whose endDate is at least gsc_warehouse.FINAL_AFTER_DAYS old never
+    expire (the reports' default window ends exactly there, so default and
+    --json dashboard runs are cached for good); anything touching more recent
+    days expires after RECENT_TTL,
+  - entries are zlib-compressed JSON, and once the total passes MAX_BYTES the least
+    recently used ones are evicted.
+
+Hit/miss/eviction counters are kept per process for --verbose. Deleting the file is
+always safe.
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+
+from gsc_warehouse import FINAL_AFTER_DAYS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = REPO_ROOT / "scripts" / ".cache" / "gsc-responses.sqlite"
+RECENT_TTL = 60 * 60          # seconds, for requests touching unfinalized days
+SITES_TTL = 24 * 60 * 60      # seconds, for sites().list()
+MAX_BYTES = 64 * 1024 * 1024  # compressed payload budget before LRU eviction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    payload    BLOB NOT NULL,
+    size       INTEGER NOT NULL,
+    expires_at REAL,              -- NULL: finalized, never expires
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def canonical_body(body: dict) -> dict:
+    """body with defaults dropped and filters sorted, so equivalent requests compare equal."""
+    out = {k: v for k, v in body.items()
+           if not (k == "startRow" and not v) and not (k == "type" and v == "web")
+           and not (k == "dimensions" and not v)}
+    if "dimensionFilterGroups" in out:
+        out["dimensionFilterGroups"] = [
+            {**g, "filters": sorted(g.get("filters", []), key=lambda f: json.dumps(f, sort_keys=True))}
+            for g in out["dimensionFilterGroups"]
+        ]
+    return out
+
+
+def cache_key(site_url: str, body: dict) -> str:
+    canon = json.dumps(canonical_body(body), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{site_url}\n{canon}".encode("utf-8")).hexdigest()
+
+
+def is_finalized(body: dict) -> bool:
+    cutoff = date.today() - timedelta(days=FINAL_AFTER_DAYS)
+    return date.fromisoformat(body["endDate"]) <= cutoff
+
+
+class ResponseCache:
+    """Size-bounded LRU of API responses. Safe to share across threads."""
+
+    def __init__(self, path: Path = DB_PATH, max_bytes: int = MAX_BYTES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if row[1] is not None and row[1] <= now:
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, response: dict, ttl: float | None) -> None:
+        """Store response; ttl None means it never expires."""
+        payload = zlib.compress(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), None if ttl is None else now + ttl, now),
+            )
+            self.stats["stores"] += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.stats["evictions"] += len(doomed)
+
+    def usage(self) -> tuple:
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def print_stats(self) -> None:
+        entries, size = self.usage()
+        s = self.stats
+        lookups = s["hits"] + s["misses"]
+        rate = f"{s['hits'] / lookups * 100:.0f}%" if lookups else "-"
+        print(f"  response cache: {s['hits']} hit(s), {s['misses']} miss(es) "
+              f"({s['expired']} expired), hit rate {rate}; {s['stores']} stored, "
+              f"{s['evictions']} evicted; {entries} entries, {size / 1024:.0f} KiB "
+              f"of {self.max_bytes / 1024 / 1024:.0f} MiB", file=sys.stderr)
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class _CachedRequest:
+    def __init__(self, cache: ResponseCache, key: str, ttl: float | None, build):
+        self.cache, self.key, self.ttl, self.build = cache, key, ttl, build
+
+    def execute(self) -> dict:
+        cached = self.cache.get(self.key)
+        if cached is not None:
+            return cached
+        response = self.build().execute()
+        self.cache.put(self.key, response, self.ttl)
+        return response
+
+
+class _SearchAnalytics:
+    def __init__(self, owner: "CachingService"):
+        self.owner = owner
+
+    def query(self, siteUrl: str, body: dict) -> _CachedRequest:  # noqa: N803 (API kwarg name)
+        ttl = None if is_finalized(body) else RECENT_TTL
+        return _CachedRequest(
+            self.owner.cache, cache_key(siteUrl, body), ttl,
+            lambda: self.owner.service().searchanalytics().query(siteUrl=siteUrl, body=body))
+
+
+class _Sites:
+    def __init__(self, owner: "CachingService"):
+        self.owner = owner
+
+    def list(self) -> _CachedRequest:
+        return _CachedRequest(self.owner.cache, cache_key("", {"method": "sites.list"}), SITES_TTL,
+                              lambda: self.owner.service().sites().list())
+
+
+class CachingService:
+    """Search Console client stand-in that answers query and sites.list from cache.
+
+    The real client is built with factory() only on the first miss, so a fully
+    cached run never imports googleapiclient or touches credentials. Like the
+    client itself, an instance is not thread-safe; build one per thread.
+    """
+
+    def __init__(self, factory, cache: ResponseCache):
+        self.factory, self.cache = factory, cache
+        self._service = None
+
+    def service(self):
+        if self._service is None:
+            self._service = self.factory()
+        return self._service
+
+    def searchanalytics(self) -> _SearchAnalytics:
+        return _SearchAnalytics(self)
+
+    def sites(self) -> _Sites:
+        return _Sites(self)
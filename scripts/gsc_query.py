@@ -0,0 +1,137 @@
+"""Composable Search Console query builder, used by search_console_report.py.
+
+Turns report intents into searchanalytics.query request bodies, pushing every
+dimension filter down into dimensionFilterGroups so the API returns only the rows a
+report needs:
+
+    q = (Query("2026-01-01", "2026-01-28", ["query"])
+         .page_regex(r"^https://avinashsangle\\.com/blog/")
+         .exclude_query_regex("avinash|sangle")
+         .device("MOBILE").country("usa").search_type("web")
+         .where("position", 10.5, 20.5).where("impressions", 5)
+         .limit(20))
+    q.body()        # the request body for one API page
+    q.accepts(row)  # True if row passes the metric predicates
+
+The API cannot filter on metrics, so where() predicates (clicks, impressions, ctr,
+position) are checked per row while pages stream in, and the caller stops paging
+once limit() rows have matched. Regexes use RE2 syntax on the API side.
+"""
+
+import copy
+
+API_PAGE_SIZE = 25_000            # searchanalytics.query maximum rowLimit
+PREDICATE_PAGE_SIZE = 1000        # page size while scanning for metric predicates
+DEVICES = ("DESKTOP", "MOBILE", "TABLET")
+SEARCH_TYPES = ("web", "image", "video", "news", "discover", "googleNews")
+METRICS = ("clicks", "impressions", "ctr", "position")
+
+
+class Query:
+    """A searchanalytics.query request: window, dimensions, pushed-down filters,
+    metric predicates and a row limit. Builder methods return self."""
+
+    def __init__(self, start: str, end: str, dimensions: list | tuple = ()):
+        self.start = start
+        self.end = end
+        self.dimensions = list(dimensions)
+        self.filters: list = []      # (dimension, operator, expression)
+        self.predicates: list = []   # (metric, lo, hi), inclusive, None = open
+        self.type = "web"
+        self.row_limit = 1000
+
+    # -- dimension filters (pushed down) ------------------------------------
+
+    def _filter(self, dimension: str, operator: str, expression: str | None) -> "Query":
+        if expression:  # None/"" is a no-op, so CLI options can be passed straight through
+            self.filters.append((dimension, operator, expression))
+        return self
+
+    def page(self, substring: str | None) -> "Query":
+        return self._filter("page", "contains", substring)
+
+    def page_regex(self, pattern: str | None) -> "Query":
+        return self._filter("page", "includingRegex", pattern)
+
+    def exclude_page_regex(self, pattern: str | None) -> "Query":
+        return self._filter("page", "excludingRegex", pattern)
+
+    def query_regex(self, pattern: str | None) -> "Query":
+        return self._filter("query", "includingRegex", pattern)
+
+    def exclude_query_regex(self, pattern: str | None) -> "Query":
+        return self._filter("query", "excludingRegex", pattern)
+
+    def device(self, name: str | None) -> "Query":
+        if name and name.upper() not in DEVICES:
+            raise ValueError(f"device must be one of {', '.join(DEVICES)}")
+        return self._filter("device", "equals", name and name.upper())
+
+    def country(self, code: str | None) -> "Query":
+        """ISO 3166-1 alpha-3 country code, e.g. "usa", "ind"."""
+        if code and len(code) != 3:
+            raise ValueError(f"country must be an ISO 3166-1 alpha-3 code, got {code!r}")
+        return self._filter("country", "equals", code and code.lower())
+
+    def search_type(self, name: str | None) -> "Query":
+        if name:
+            if name not in SEARCH_TYPES:
+                raise ValueError(f"search type must be one of {', '.join(SEARCH_TYPES)}")
+            self.type = name
+        return self
+
+    # -- metric predicates (streamed) -----------------------------------------
+
+    def where(self, metric: str, lo: float | None = None, hi: float | None = None) -> "Query":
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+        self.predicates.append((metric, lo, hi))
+        return self
+
+    def limit(self, n: int) -> "Query":
+        self.row_limit = n
+        return self
+
+    # -- derived ------------------------------------------------------------
+
+    def with_dimensions(self, dimensions: list) -> "Query":
+        """A copy of this query (filters, type, predicates) over other dimensions."""
+        q = copy.deepcopy(self)
+        q.dimensions = list(dimensions)
+        return q
+
+    def key(self) -> tuple:
+        """Identity of the API request, ignoring predicates and limit (they are client-side)."""
+        return (self.start, self.end, tuple(self.dimensions), tuple(self.filters), self.type)
+
+    def page_size(self) -> int:
+        """Rows to request per API page: just the limit, unless predicates must scan."""
+        if self.predicates:
+            return min(API_PAGE_SIZE, max(self.row_limit, PREDICATE_PAGE_SIZE))
+        return min(API_PAGE_SIZE, self.row_limit)
+
+    def body(self, start_row: int = 0, row_limit: int | None = None) -> dict:
+        body = {
+            "startDate": self.start,
+            "endDate": self.end,
+            "dimensions": self.dimensions,
+            "rowLimit": row_limit or self.page_size(),
+        }
+        if self.type != "web":
+            body["type"] = self.type
+        if start_row:
+            body["startRow"] = start_row
+        if self.filters:
+            # One group, all filters ANDed (the API's only groupType).
+            body["dimensionFilterGroups"] = [{"filters": [
+                {"dimension": d, "operator": op, "expression": expr}
+                for d, op, expr in self.filters
+            ]}]
+        return body
+
+    def accepts(self, row: dict) -> bool:
+        for metric, lo, hi in self.predicates:
+            value = row[metric]
+            if (lo is not None and value < lo) or (hi is not None and value > hi):
+                return False
+        return True
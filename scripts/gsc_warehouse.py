@@ -0,0 +1,222 @@
+"""Local Search Console warehouse for search_console_report.py --local.
+
+GSC rows at least FINAL_AFTER_DAYS old (its ~3-day processing lag, which is also
+where the reports' default window ends) never change, so re-downloading the whole
+--days window on every report is wasted time and quota. This keeps daily rows in
+SQLite (scripts/.cache/gsc-warehouse.sqlite) and syncs only days that are missing
+or were still unfinalized when they were last fetched more than RECENT_TTL ago:
+
+    site_daily        date                    -> totals   (dimensions: date)
+    query_daily       date, query             -> metrics  (dimensions: date, query)
+    page_daily        date, page              -> metrics  (dimensions: date, page)
+    query_page_daily  date, query, page       -> metrics  (dimensions: date, query, page)
+
+Each grain is fetched separately because GSC drops anonymized queries from
+query-level rows, so summing query x page rows undercounts pages and totals.
+
+LocalService mimics the googleapiclient surface the report uses
+(service.searchanalytics().query(siteUrl=..., body=...).execute()), so
+run_summary() and run_single_type() answer from the warehouse unchanged.
+Positions are re-aggregated impression-weighted, as GSC does.
+"""
+
+import re
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = REPO_ROOT / "scripts" / ".cache" / "gsc-warehouse.sqlite"
+FINAL_AFTER_DAYS = 3   # GSC's processing lag: days at least this old are final, and
+                       # the reports' default window ends here
+RECENT_TTL = 6 * 60 * 60   # seconds before a not-yet-final day is re-synced
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS site_daily (
+    date TEXT PRIMARY KEY,
+    clicks INTEGER NOT NULL, impressions INTEGER NOT NULL, position REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS query_daily (
+    date TEXT NOT NULL, query TEXT NOT NULL,
+    clicks INTEGER NOT NULL, impressions INTEGER NOT NULL, position REAL NOT NULL,
+    PRIMARY KEY (date, query)
+);
+CREATE TABLE IF NOT EXISTS page_daily (
+    date TEXT NOT NULL, page TEXT NOT NULL,
+    clicks INTEGER NOT NULL, impressions INTEGER NOT NULL, position REAL NOT NULL,
+    PRIMARY KEY (date, page)
+);
+CREATE TABLE IF NOT EXISTS query_page_daily (
+    date TEXT NOT NULL, query TEXT NOT NULL, page TEXT NOT NULL,
+    clicks INTEGER NOT NULL, impressions INTEGER NOT NULL, position REAL NOT NULL,
+    PRIMARY KEY (date, query, page)
+);
+CREATE TABLE IF NOT EXISTS synced_days (
+    date      TEXT PRIMARY KEY,
+    final     INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+# table -> the dimensions it is keyed by (besides the metrics)
+TABLES = {
+    "site_daily": ("date",),
+    "query_daily": ("date", "query"),
+    "page_daily": ("date", "page"),
+    "query_page_daily": ("date", "query", "page"),
+}
+
+_OPERATORS = {
+    "equals": "{col} = ?",
+    "notEquals": "{col} != ?",
+    "contains": "instr({col}, ?) > 0",
+    "notContains": "instr({col}, ?) = 0",
+    "includingRegex": "{col} REGEXP ?",
+    "excludingRegex": "NOT ({col} REGEXP ?)",
+}
+
+
+def _regexp(pattern: str, value: str) -> bool:
+    return value is not None and re.search(pattern, value) is not None
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path))
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    db.create_function("REGEXP", 2, _regexp, deterministic=True)
+    return db
+
+
+def _days(start: str, end: str) -> list:
+    d, last = date.fromisoformat(start), date.fromisoformat(end)
+    out = []
+    while d <= last:
+        out.append(d.isoformat())
+        d += timedelta(days=1)
+    return out
+
+
+def days_to_sync(db: sqlite3.Connection, start: str, end: str) -> list:
+    """Days in [start, end] never synced, or unfinalized when synced over RECENT_TTL ago."""
+    have = {d for (d,) in db.execute(
+        "SELECT date FROM synced_days WHERE (final = 1 OR synced_at >= ?) AND date BETWEEN ? AND ?",
+        (time.time() - RECENT_TTL, start, end))}
+    return [d for d in _days(start, end) if d not in have]
+
+
+def _ranges(days: list) -> list:
+    """Collapse sorted ISO days into contiguous (first, last) ranges."""
+    ranges = []
+    for d in days:
+        if ranges and date.fromisoformat(d) - date.fromisoformat(ranges[-1][1]) == timedelta(days=1):
+            ranges[-1][1] = d
+        else:
+            ranges.append([d, d])
+    return [tuple(r) for r in ranges]
+
+
+def sync(db: sqlite3.Connection, start: str, end: str, fetch) -> int:
+    """Fetch and upsert every missing/unfinalized day in [start, end]; return days synced.
+
+    fetch(start, end, dimensions) must yield raw API rows ({"keys", "clicks", ...})
+    across all pages. Contiguous missing days are fetched as one date range per
+    table rather than one request per day.
+    """
+    pending = days_to_sync(db, start, end)
+    final_cutoff = (date.today() - timedelta(days=FINAL_AFTER_DAYS)).isoformat()
+    for first, last in _ranges(pending):
+        started = time.monotonic()
+        counts = {}
+        with db:  # one transaction per range: a failed sync leaves the range unsynced
+            for table, dims in TABLES.items():
+                cols = ", ".join(dims)
+                marks = ", ".join("?" * (len(dims) + 3))
+                db.execute(f"DELETE FROM {table} WHERE date BETWEEN ? AND ?", (first, last))
+                rows = [(*r["keys"], int(r["clicks"]), int(r["impressions"]), r["position"])
+                        for r in fetch(first, last, list(dims))]
+                db.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({cols}, clicks, impressions, position) "
+                    f"VALUES ({marks})", rows)
+                counts[table] = len(rows)
+            db.executemany(
+                "INSERT OR REPLACE INTO synced_days (date, final, synced_at) VALUES (?, ?, ?)",
+                [(d, int(d <= final_cutoff), time.time()) for d in _days(first, last)])
+        print(f"  synced {first}..{last}: " + ", ".join(f"{t} {n}" for t, n in counts.items())
+              + f" ({time.monotonic() - started:.1f}s)", file=sys.stderr)
+    return len(pending)
+
+
+def query(db: sqlite3.Connection, body: dict) -> list:
+    """Answer a searchanalytics.query request body from the warehouse."""
+    if body.get("type", "web") != "web":
+        sys.exit("The local warehouse only holds web search data; run without --local.")
+    dims = list(body.get("dimensions", []))
+    filters = [f for g in body.get("dimensionFilterGroups", []) for f in g.get("filters", [])]
+    needed = set(dims) | {f["dimension"] for f in filters}
+    table = next((t for t, cols in TABLES.items() if needed <= set(cols)), None)
+    if table is None:
+        sys.exit(f"The local warehouse has no {sorted(needed - {'date', 'query', 'page'})} "
+                 "data; run without --local.")
+
+    where, params = ["date BETWEEN ? AND ?"], [body["startDate"], body["endDate"]]
+    for f in filters:
+        template = _OPERATORS.get(f.get("operator", "equals"))
+        if template is None:
+            sys.exit(f"Unsupported filter operator for --local: {f.get('operator')}")
+        where.append(template.format(col=f["dimension"]))
+        params.append(f["expression"])
+
+    select = ", ".join(dims + ["SUM(clicks)", "SUM(impressions)", "SUM(position * impressions)"])
+    sql = f"SELECT {select} FROM {table} WHERE {' AND '.join(where)}"
+    if dims:
+        sql += f" GROUP BY {', '.join(dims)}"
+    n = len(dims)
+    sql += f" ORDER BY {n + 1} DESC, {n + 2} DESC LIMIT ? OFFSET ?"
+    params += [body.get("rowLimit", 1000), body.get("startRow", 0)]
+
+    rows = []
+    for rec in db.execute(sql, params):
+        clicks, impressions, pos_weight = rec[n], rec[n + 1], rec[n + 2]
+        if not impressions:
+            continue
+        rows.append({
+            "keys": list(rec[:n]),
+            "clicks": clicks,
+            "impressions": impressions,
+            "ctr": clicks / impressions,
+            "position": pos_weight / impressions,
+        })
+    return rows
+
+
+class _Request:
+    def __init__(self, db, body):
+        self.db, self.body = db, body
+
+    def execute(self) -> dict:
+        return {"rows": query(self.db, self.body)}
+
+
+class _SearchAnalytics:
+    def __init__(self, db):
+        self.db = db
+
+    def query(self, siteUrl: str, body: dict) -> _Request:  # noqa: N803 (API kwarg name)
+        return _Request(self.db, body)
+
+
+class LocalService:
+    """Stand-in for the Search Console client that reads from the warehouse.
+
+    Each instance owns its own SQLite connection, so build one per thread.
+    """
+
+    def __init__(self, path: Path = DB_PATH):
+        self.db = connect(path)
+
+    def searchanalytics(self) -> _SearchAnalytics:
+        return _SearchAnalytics(self.db)
@@ -0,0 +1,214 @@
+"""Local SQLite store for URL Inspection results, used by request_indexing.py.
+
+Holds the latest inspection per URL (verdict, coverageState, indexingState,
+lastCrawlTime) so re-runs within the TTL answer from disk instead of spending
+quota. It also keeps a per-day ledger of API calls against the property's daily
+URL Inspection quota.
+
+Google resets the daily quota at midnight Pacific time, so ledger days are
+Pacific dates rather than UTC or local ones.
+
+Every fresh inspection is also appended to a snapshot history, tagged with the run
+that produced it, so transitions between runs (PASS -> NEUTRAL, a new crawl, a
+coverage change) can be reported. Finding the previous observation of a URL is an
+indexed (url, first_seen) lookup, not a scan of the history. Consecutive identical
+observations of a URL are periodically compacted into one row spanning
+first_seen..last_seen, so the history grows with state changes, not with runs.
+
+The database lives at scripts/.cache/inspections.sqlite; deleting it is safe.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = REPO_ROOT / "scripts" / ".cache" / "inspections.sqlite"
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inspections (
+    url          TEXT PRIMARY KEY,
+    verdict      TEXT NOT NULL,
+    coverage     TEXT NOT NULL,
+    indexing     TEXT NOT NULL,
+    crawled      TEXT NOT NULL,
+    inspected_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota (
+    day  TEXT PRIMARY KEY,
+    used INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id         INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id         INTEGER PRIMARY KEY,
+    run_id     INTEGER NOT NULL,
+    url        TEXT NOT NULL,
+    verdict    TEXT NOT NULL,
+    coverage   TEXT NOT NULL,
+    indexing   TEXT NOT NULL,
+    crawled    TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_url_seen ON snapshots (url, first_seen);
+CREATE INDEX IF NOT EXISTS snapshots_run ON snapshots (run_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STATE_FIELDS = ("verdict", "coverage", "indexing", "crawled")
+COMPACT_EVERY = 5000   # snapshot rows appended between automatic compactions
+
+
+def quota_day(ts: float | None = None) -> str:
+    return datetime.fromtimestamp(ts or time.time(), QUOTA_TZ).date().isoformat()
+
+
+class InspectionStore:
+    """Inspection cache, quota ledger and snapshot history. Safe to share across threads."""
+
+    def __init__(self, path: Path = DB_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.run_id = None
+
+    def get(self, url: str, ttl_seconds: float) -> dict | None:
+        """Return the cached status for url if it is younger than ttl_seconds."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT verdict, coverage, indexing, crawled, inspected_at "
+                "FROM inspections WHERE url = ?", (url,)
+            ).fetchone()
+        if not row or time.time() - row[4] > ttl_seconds:
+            return None
+        return {"verdict": row[0], "coverage": row[1], "indexing": row[2],
+                "crawled": row[3], "cached_at": row[4]}
+
+    def put(self, url: str, status: dict) -> None:
+        """Cache a fresh inspection and append it to the snapshot history."""
+        now = time.time()
+        with self.lock:
+            if self.run_id is None:
+                self.run_id = self.db.execute(
+                    "INSERT INTO runs (started_at) VALUES (?)", (now,)).lastrowid
+            self.db.execute(
+                "INSERT INTO snapshots (run_id, url, verdict, coverage, indexing, crawled, "
+                "first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, url, *(status[f] for f in STATE_FIELDS), now, now),
+            )
+            self.db.execute(
+                "INSERT INTO inspections (url, verdict, coverage, indexing, crawled, inspected_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET verdict = excluded.verdict, "
+                "coverage = excluded.coverage, indexing = excluded.indexing, "
+                "crawled = excluded.crawled, inspected_at = excluded.inspected_at",
+                (url, status["verdict"], status["coverage"], status["indexing"],
+                 status["crawled"], now),
+            )
+
+    def record_call(self, n: int = 1) -> None:
+        """Count n API calls (retries included) against today's quota."""
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO quota (day, used) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET used = used + excluded.used",
+                (quota_day(), n),
+            )
+
+    def used_today(self) -> int:
+        with self.lock:
+            row = self.db.execute("SELECT used FROM quota WHERE day = ?", (quota_day(),)).fetchone()
+        return row[0] if row else 0
+
+    def latest_run(self) -> int | None:
+        with self.lock:
+            row = self.db.execute("SELECT MAX(id) FROM runs").fetchone()
+        return row[0]
+
+    def transitions(self, run_id: int) -> list:
+        """Return what changed in run_id relative to each URL's previous observation.
+
+        Each item is {"url", "change", "before", "after"}; URLs whose state did not
+        change are omitted. A URL seen for the first time reports change "new".
+        """
+        cols = ", ".join(f"cur.{f}" for f in STATE_FIELDS) + ", " + \
+            ", ".join(f"prev.{f}" for f in STATE_FIELDS)
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT cur.url, {cols} FROM snapshots cur "
+                "LEFT JOIN snapshots prev ON prev.id = ("
+                "  SELECT p.id FROM snapshots p WHERE p.url = cur.url "
+                "  AND p.first_seen < cur.first_seen ORDER BY p.first_seen DESC LIMIT 1) "
+                "WHERE cur.run_id = ? ORDER BY cur.url",
+                (run_id,),
+            ).fetchall()
+        out = []
+        n = len(STATE_FIELDS)
+        for row in rows:
+            url, after, before = row[0], dict(zip(STATE_FIELDS, row[1:1 + n])), row[1 + n:]
+            if before[0] is None:
+                out.append({"url": url, "change": "new", "before": None, "after": after})
+                continue
+            before = dict(zip(STATE_FIELDS, before))
+            changes = []
+            if before["verdict"] != after["verdict"]:
+                changes.append(f"verdict {before['verdict']}→{after['verdict']}")
+            if before["coverage"] != after["coverage"]:
+                changes.append("coverage")
+            if before["indexing"] != after["indexing"]:
+                changes.append("indexing state")
+            if before["crawled"] != after["crawled"]:
+                changes.append("new crawl")
+            if changes:
+                out.append({"url": url, "change": ", ".join(changes), "before": before, "after": after})
+        return out
+
+    def compact(self, force: bool = False) -> int:
+        """Merge consecutive identical snapshots per URL; return rows removed.
+
+        Runs only once COMPACT_EVERY rows were appended since the last compaction,
+        unless force is set.
+        """
+        with self.lock:
+            total = self.db.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'compacted_rows'").fetchone()
+            if not force and total - (row[0] if row else 0) < COMPACT_EVERY:
+                return 0
+            cols = ", ".join(STATE_FIELDS)
+            keep_updates, deletes = [], []
+            prev_url = prev_state = keep_id = None
+            for rid, url, *rest in self.db.execute(
+                f"SELECT id, url, {cols}, last_seen FROM snapshots ORDER BY url, first_seen"
+            ):
+                state, last_seen = tuple(rest[:-1]), rest[-1]
+                if url == prev_url and state == prev_state:
+                    deletes.append((rid,))
+                    keep_updates.append((last_seen, keep_id))
+                else:
+                    keep_id, prev_url, prev_state = rid, url, state
+            self.db.execute("BEGIN")
+            self.db.executemany("UPDATE snapshots SET last_seen = MAX(last_seen, ?) WHERE id = ?",
+                                keep_updates)
+            self.db.executemany("DELETE FROM snapshots WHERE id = ?", deletes)
+            self.db.execute(
+                "INSERT INTO meta (key, value) VALUES ('compacted_rows', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (total - len(deletes),),
+            )
+            self.db.execute("COMMIT")
+        return len(deletes)
+
+    def close(self) -> None:
+        self.db.close()
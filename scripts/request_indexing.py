@@ -7,24 +7,59 @@ API or submitting via Search Console UI.
 This script uses the URL Inspection API to check indexing status and provides
 instructions for requesting re-indexing.
 
+Bulk modes inspect concurrently (--workers, one service object per thread) behind a
+token bucket tuned to the URL Inspection quotas (600/minute, 2000/day per property,
+run at 90%). 429/5xx and network errors are retried with jittered backoff, and each
+result is printed as it completes.
+
+Results are cached in scripts/.cache/inspections.sqlite (see inspection_store.py).
+A URL inspected within --ttl hours (default 24) is answered from the cache unless
+--refresh is given. Every API call is counted in a per-day ledger that warns as
+the daily budget runs low and stops before it is exhausted.
+
+Fresh results are also appended to a snapshot history in the same database.
+--diff prints what changed in this run versus each URL's previous inspection
+(PASS -> NEUTRAL, coverage/indexing state changes, new crawls). On its own, --diff
+reports the most recent run without calling the API.
+
+Clients come from google_client.py (lazy imports, cached discovery document and
+access token); --timings prints how long each startup stage took.
+
 Usage:
     python scripts/request_indexing.py <url>
     python scripts/request_indexing.py --all-blog-posts
+    python scripts/request_indexing.py --all-sitemap-urls
+    python scripts/request_indexing.py --all-sitemap-urls --source local   # no sitemap fetch
+    python scripts/request_indexing.py --all-blog-posts --refresh   # ignore cached results
+    python scripts/request_indexing.py --all-blog-posts --diff      # show index transitions
+    python scripts/request_indexing.py --diff                       # transitions from last run
     python scripts/request_indexing.py --ping-sitemap
 
 Examples:
     python scripts/request_indexing.py https://avinashsangle.com/blog/gemma-4-models-guide/
+    python scripts/request_indexing.py --all-blog-posts --refresh   # ignore cached results
+    python scripts/request_indexing.py --all-blog-posts --diff      # show index transitions
+    python scripts/request_indexing.py --diff                       # transitions from last run
     python scripts/request_indexing.py --ping-sitemap
 """
 
 import argparse
+import atexit
 import json
+import random
 import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import requests
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+
+import google_client
+from inspection_store import InspectionStore
+from site_urls import local_entries
+from sitemap_reader import iter_sitemap
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 CREDS_PATH = REPO_ROOT / "scripts" / "credentials" / "gsc-service-account.json"
@@ -33,50 +68,235 @@ BASE_URL = "https://avinashsangle.com"
 SCOPES = ["https://www.googleapis.com/auth/webmasters"]
 SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
 
+# URL Inspection API quotas (per property): 600 queries/minute, 2000 queries/day.
+# The limiter runs at QUOTA_SAFETY of each so other tools sharing the property
+# (and the Search Console UI) keep some headroom.
+QUOTA_PER_MINUTE = 600
+QUOTA_PER_DAY = 2000
+QUOTA_SAFETY = 0.9
+QUOTA_WARN_FRACTION = 0.1   # warn once less than 10% of the daily budget is left
+DEFAULT_TTL_HOURS = 24
+MAX_WORKERS = 8
+MAX_ATTEMPTS = 4
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
 
 def get_service():
+    return google_client.get_service(SCOPES, CREDS_PATH)
+
+
+def fetch_inspection(service, url: str) -> dict:
+    """Return the index status fields for url; raises on API errors."""
+    result = service.urlInspection().index().inspect(
+        body={
+            "inspectionUrl": url,
+            "siteUrl": SITE_URL,
+        }
+    ).execute()
+
+    inspection = result.get("inspectionResult", {})
+    index_status = inspection.get("indexStatusResult", {})
+    return {
+        "verdict": index_status.get("verdict", "UNKNOWN"),
+        "coverage": index_status.get("coverageState", "UNKNOWN"),
+        "indexing": index_status.get("indexingState", "UNKNOWN"),
+        "crawled": index_status.get("lastCrawlTime", "never"),
+    }
+
+
+def print_inspection(url: str, status: dict, prefix: str = "") -> None:
+    print(f"\n  {prefix}URL: {url}")
+    if "error" in status:
+        print(f"  Inspection failed: {status['error']}")
+        return
+    verdict = status["verdict"]
+    print(f"  Verdict:        {verdict}")
+    print(f"  Coverage:       {status['coverage']}")
+    print(f"  Indexing state: {status['indexing']}")
+    print(f"  Last crawled:   {status['crawled']}")
+
+    if verdict == "PASS":
+        print("  Status: INDEXED - page is in Google's index")
+    elif verdict == "NEUTRAL":
+        print("  Status: NOT INDEXED or excluded by robots/canonical")
+    else:
+        print(f"  Status: {verdict} - may need attention")
+    if "cached_at" in status:
+        age_h = (time.time() - status["cached_at"]) / 3600
+        print(f"  (cached {age_h:.1f}h ago; --refresh to re-inspect)")
+
+
+def quota_check(store: InspectionStore, planned: int | None = None) -> int:
+    """Return how many more inspections today's budget allows, warning when it is low.
+
+    planned is None when the number of URLs is not known up front (streamed input).
+    """
+    daily_budget = int(QUOTA_PER_DAY * QUOTA_SAFETY)
+    used = store.used_today()
+    remaining = max(0, daily_budget - used)
+    if (planned or 0) > remaining or remaining <= daily_budget * QUOTA_WARN_FRACTION:
+        print(f"  Warning: {used} of {daily_budget} inspections used today (Pacific time); "
+              f"{remaining} left" + (f" for {planned} planned." if planned is not None else "."))
+    return remaining
+
+
+def inspect_url(service, url: str, store: InspectionStore, ttl_seconds: float,
+                refresh: bool = False) -> None:
+    """Check the indexing status of a URL."""
+    status = None if refresh else store.get(url, ttl_seconds)
+    if status is None:
+        if not quota_check(store, 1):
+            sys.exit("Daily URL Inspection budget exhausted; try again after midnight Pacific.")
+        store.record_call()
+        try:
+            status = fetch_inspection(service, url)
+            store.put(url, status)
+        except Exception as exc:
+            status = {"error": exc}
+    print_inspection(url, status)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens per second, holds at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _is_transient(exc: Exception) -> bool:
+    from googleapiclient.errors import HttpError  # google libraries load lazily
+
+    if isinstance(exc, HttpError):
+        return exc.resp.status in TRANSIENT_STATUSES
+    return isinstance(exc, (OSError, TimeoutError))
+
+
+def inspect_many(urls, store: InspectionStore, ttl_seconds: float, refresh: bool = False,
+                 workers: int = MAX_WORKERS) -> dict:
+    """Inspect urls concurrently inside the per-minute and per-day quotas.
+
+    urls may be any iterable (including a streaming sitemap); each URL is submitted
+    to the pool as it arrives, so inspections overlap the download, and each result
+    is printed as soon as it completes (counted as done/submitted so far). URLs
+    inspected within ttl_seconds are answered from the store unless refresh is set.
+    Returns {url: status}. Every attempt, retries included, spends one call of today's
+    remaining budget; once it is gone, URLs are not inspected and in-flight retries
+    stop, leaving those URLs {"deferred": True} for the next run.
+    """
+    bucket = TokenBucket(rate=QUOTA_PER_MINUTE * QUOTA_SAFETY / 60, capacity=workers)
+    local = threading.local()
+    budget = {"left": 0}
+    budget_lock = threading.Lock()
+
+    def spend() -> bool:
+        with budget_lock:
+            if budget["left"] <= 0:
+                return False
+            budget["left"] -= 1
+            store.record_call()
+            return True
+
+    def worker(url: str) -> dict:
+        # googleapiclient services wrap an httplib2 client that is not thread-safe.
+        if not hasattr(local, "service"):
+            local.service = get_service()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            bucket.acquire()
+            if not spend():
+                return {"error": "daily budget exhausted; deferred to the next run", "deferred": True}
+            try:
+                return fetch_inspection(local.service, url)
+            except Exception as exc:
+                if attempt == MAX_ATTEMPTS or not _is_transient(exc):
+                    return {"error": exc}
+                time.sleep(random.uniform(0.5, 1.0) * 2 ** attempt)
+        return {"error": "unreachable"}
+
     if not CREDS_PATH.exists():
         sys.exit(f"Credentials not found: {CREDS_PATH}")
-    creds = service_account.Credentials.from_service_account_file(
-        str(CREDS_PATH), scopes=SCOPES
-    )
-    return build("searchconsole", "v1", credentials=creds)
+    results: dict = {}
+    started = time.monotonic()
+    budget["left"] = quota_check(store)
+    futures: dict = {}
+    seen = set()
+    cached = submitted = over_budget = 0
 
+    def report(fut) -> None:
+        url = futures.pop(fut)
+        results[url] = fut.result()
+        if "error" not in results[url]:
+            store.put(url, results[url])
+        print_inspection(url, results[url], prefix=f"[{len(results) - cached}/{submitted}] ")
 
-def inspect_url(service, url: str) -> None:
-    """Check the indexing status of a URL."""
-    try:
-        result = service.urlInspection().index().inspect(
-            body={
-                "inspectionUrl": url,
-                "siteUrl": SITE_URL,
-            }
-        ).execute()
-
-        inspection = result.get("inspectionResult", {})
-        index_status = inspection.get("indexStatusResult", {})
-
-        verdict = index_status.get("verdict", "UNKNOWN")
-        coverage = index_status.get("coverageState", "UNKNOWN")
-        crawled = index_status.get("lastCrawlTime", "never")
-        indexing = index_status.get("indexingState", "UNKNOWN")
-
-        print(f"\n  URL: {url}")
-        print(f"  Verdict:        {verdict}")
-        print(f"  Coverage:       {coverage}")
-        print(f"  Indexing state: {indexing}")
-        print(f"  Last crawled:   {crawled}")
-
-        if verdict == "PASS":
-            print("  Status: INDEXED - page is in Google's index")
-        elif verdict == "NEUTRAL":
-            print("  Status: NOT INDEXED or excluded by robots/canonical")
-        else:
-            print(f"  Status: {verdict} - may need attention")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for url in urls:
+            if url in seen:
+                continue
+            seen.add(url)
+            status = None if refresh else store.get(url, ttl_seconds)
+            if status:
+                results[url] = status
+                cached += 1
+                print_inspection(url, status, prefix="[cached] ")
+            elif budget["left"] > 0:
+                futures[pool.submit(worker, url)] = url
+                submitted += 1
+            else:
+                over_budget += 1
+            for fut in [f for f in futures if f.done()]:
+                report(fut)
+        for fut in as_completed(list(futures)):
+            report(fut)
 
-    except Exception as exc:
-        print(f"\n  URL: {url}")
-        print(f"  Inspection failed: {exc}")
+    stopped = sum(1 for r in results.values() if r.get("deferred"))
+    if over_budget + stopped:
+        print(f"  Deferred {over_budget + stopped} URL(s) beyond today's budget.")
+    verdicts = Counter(r.get("verdict", "DEFERRED" if r.get("deferred") else "FAILED")
+                       for r in results.values())
+    summary = ", ".join(f"{v}: {n}" for v, n in verdicts.most_common())
+    print(f"\nInspected {submitted - stopped} URL(s), {cached} from cache, in "
+          f"{time.monotonic() - started:.1f}s — {summary}")
+    print(f"Quota used today: {store.used_today()}/{int(QUOTA_PER_DAY * QUOTA_SAFETY)} "
+          f"(of Google's {QUOTA_PER_DAY})")
+    return results
+
+
+def print_diff(store: InspectionStore) -> None:
+    run_id = store.run_id or store.latest_run()
+    if run_id is None:
+        print("\nNo inspection history yet; run an inspection first.")
+        return
+    changes = store.transitions(run_id)
+    print(f"\n  INDEX TRANSITIONS (run {run_id} vs previous inspection)")
+    if not changes:
+        print("  (no changes)")
+        return
+    width = max(len("URL"), *(len(c["url"]) for c in changes))
+    print(f"  {'URL'.ljust(width)}  Change")
+    print(f"  {'-' * width}  ------")
+    for c in changes:
+        detail = c["change"]
+        if c["before"] and "new crawl" in detail:
+            detail += f" ({c['before']['crawled']} -> {c['after']['crawled']})"
+        elif c["before"] is None:
+            detail += f" ({c['after']['verdict']})"
+        print(f"  {c['url'].ljust(width)}  {detail}")
 
 
 def ping_sitemap() -> None:
@@ -107,29 +327,65 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Check indexing status and ping sitemap.")
     parser.add_argument("url", nargs="?", help="URL to inspect")
     parser.add_argument("--all-blog-posts", action="store_true", help="Inspect all blog post URLs")
+    parser.add_argument("--all-sitemap-urls", action="store_true",
+                        help="Inspect every URL in the live sitemap (streamed as it downloads)")
+    parser.add_argument("--source", choices=["sitemap", "local"], default="sitemap",
+                        help="Where --all-sitemap-urls gets URLs: the live sitemap, or "
+                             "src/app/sitemap.ts read offline (default: sitemap)")
     parser.add_argument("--ping-sitemap", action="store_true", help="Ping Google sitemap")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Concurrent inspections for bulk modes (default {MAX_WORKERS})")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_HOURS,
+                        help=f"Reuse inspections younger than this many hours (default {DEFAULT_TTL_HOURS})")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached inspections")
+    parser.add_argument("--timings", action="store_true", help="Print client startup timings")
+    parser.add_argument("--diff", action="store_true",
+                        help="Show index transitions versus each URL's previous inspection")
     args = parser.parse_args()
+    ttl_seconds = args.ttl * 3600
+    store = InspectionStore()
+    # Every mode below returns early, so the end-of-run reports hang off atexit
+    # (registered in reverse: diff prints before timings).
+    if args.timings:
+        atexit.register(google_client.print_timings)
+    if args.diff:
+        atexit.register(print_diff, store)
+    atexit.register(store.compact)
 
     if args.ping_sitemap:
         ping_sitemap()
-        if not args.url and not args.all_blog_posts:
+        if not args.url and not args.all_blog_posts and not args.all_sitemap_urls:
             return
 
-    service = get_service()
+    if args.diff and not (args.url or args.all_blog_posts or args.all_sitemap_urls):
+        return  # report-only: print_diff runs at exit
+
+    if args.all_sitemap_urls:
+        if args.source == "local":
+            print("Inspecting URLs from src/app/sitemap.ts:\n")
+            entries = local_entries()
+        else:
+            print(f"Inspecting URLs from {SITEMAP_URL}:\n")
+            entries = iter_sitemap(SITEMAP_URL)
+        inspect_many((url for url, _ in entries), store, ttl_seconds,
+                     args.refresh, args.workers)
+        print("To request re-indexing, visit Google Search Console:")
+        print("  https://search.google.com/search-console")
+        print("  Paste each URL in the top bar -> click 'Request Indexing'")
+        return
 
     if args.all_blog_posts:
         urls = get_blog_urls()
-        print(f"Inspecting {len(urls)} blog posts:\n")
-        for url in urls:
-            inspect_url(service, url)
-        print()
+        print(f"Inspecting {len(urls)} blog posts:")
+        inspect_many(urls, store, ttl_seconds, args.refresh, args.workers)
         print("To request re-indexing, visit Google Search Console:")
         print("  https://search.google.com/search-console")
         print("  Paste each URL in the top bar -> click 'Request Indexing'")
         return
 
     if args.url:
-        inspect_url(service, args.url)
+        cached = None if args.refresh else store.get(args.url, ttl_seconds)
+        inspect_url(None if cached else get_service(), args.url, store, ttl_seconds, args.refresh)
         print()
         print("To request re-indexing:")
         print("  1. Go to https://search.google.com/search-console")
@@ -7,7 +7,52 @@ Usage:
     python scripts/search_console_report.py --type queries    # top queries only
     python scripts/search_console_report.py --type pages      # top pages only
     python scripts/search_console_report.py --type opportunities  # page-2 keywords (pos 11-20)
+    python scripts/search_console_report.py --type cannibalization --page-regex '/blog/'  # pages competing for a query
+    python scripts/search_console_report.py --type queries --page-regex '/blog/' \
+        --exclude-query-regex 'avinash|sangle' --device mobile --country usa
     python scripts/search_console_report.py --json            # output as JSON
+    python scripts/search_console_report.py --timings         # print client startup timings
+    python scripts/search_console_report.py --json --verbose  # also print response cache hit/miss stats
+    python scripts/search_console_report.py --days 480 --export gsc.jsonl.gz   # every row, paged
+    python scripts/search_console_report.py --export gsc-parquet --export-format parquet \
+        --dimensions date,query,page,device,country
+    python scripts/search_console_report.py --local           # answer from the local warehouse
+    python scripts/search_console_report.py --compare         # last N days vs the N days before
+    python scripts/search_console_report.py --anomalies       # z-score spikes/drops in daily clicks
+
+Requests are built with gsc_query.Query: --page/--page-regex/--query-regex (and
+their --exclude-* forms), --device, --country and --search-type are pushed down as
+dimensionFilterGroups, so the API only returns matching rows. Metric conditions the
+API cannot filter on (opportunities = position 11-20 with 5+ impressions) are
+checked while pages stream in, and paging stops once enough rows have matched.
+
+The summary merges logically identical queries (top queries and opportunities are
+both ["query"] with the same filters, so they share one stream of pages) and runs
+the remaining ones concurrently with a client per thread, so it takes about as long
+as the slowest single query.
+
+--export pages through searchanalytics.query with startRow / rowLimit=25000 and
+streams each page to disk as it arrives, so memory is bounded by one page. An
+interrupted export resumes from the last completed page when the same command is
+rerun. The output is gzip JSONL (one gzip member per page), or a directory of
+Parquet part files if pyarrow is installed.
+
+Query responses (and the property list) are cached on disk by gsc_cache.py:
+ranges past the finalization lag never expire, recent ones after an hour, so a
+dashboard polling --json gets repeat answers without an API round trip. --verbose
+prints the cache's hit/miss counts; --no-cache bypasses it.
+
+--local syncs only the days of the window that are missing (or not yet final and
+last synced over gsc_warehouse.RECENT_TTL ago) into the SQLite warehouse in
+scripts/.cache/ (see gsc_warehouse.py), then answers the summary and --type reports
+from it. Re-running a report over an already synced window makes no API calls at
+all, and does not even build the API client.
+
+--compare and --anomalies always read from the warehouse (syncing first), through
+the NumPy code in gsc_analytics.py: per-query and per-page deltas of clicks,
+impressions, CTR and impression-weighted position between the window and the one
+before it, and daily clicks flagged when they sit ANOMALY_Z standard deviations
+away from the previous ANOMALY_WINDOW days.
 
 Prerequisites:
     - Service account JSON at scripts/credentials/gsc-service-account.json
@@ -16,28 +61,40 @@ Prerequisites:
 """
 
 import argparse
+import gzip
 import json
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from pathlib import Path
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+import google_client
+import gsc_cache
+import gsc_warehouse
+from gsc_query import API_PAGE_SIZE, DEVICES, SEARCH_TYPES, Query
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 CREDS_PATH = REPO_ROOT / "scripts" / "credentials" / "gsc-service-account.json"
 SITE_URL = "sc-domain:avinashsangle.com"  # domain property
 SITE_URL_PREFIX = "https://avinashsangle.com"  # fallback: URL-prefix property
 SCOPES = ["https://www.googleapis.com/auth/webmasters.readonly"]
+MAX_WORKERS = 4
+EXPORT_DIMENSIONS = ("date", "query", "page", "device", "country")
+ANOMALY_WINDOW = 7      # days of baseline for rolling averages and z-scores
+ANOMALY_Z = 3.0         # |z| at or above this is flagged
+ANOMALY_TOP_KEYS = 50   # queries/pages (by impressions) checked for anomalies
+OPPORTUNITY_POSITION = (10.5, 20.5)   # page 2
+OPPORTUNITY_MIN_IMPRESSIONS = 5
+CANNIBAL_MIN_IMPRESSIONS = 20   # ignore queries with fewer impressions in the window
+CANNIBAL_MIN_SHARE = 0.10       # a page competes if it gets at least this share of them
+
+_local = threading.local()
 
 
 def get_service():
-    if not CREDS_PATH.exists():
-        sys.exit(f"Credentials not found: {CREDS_PATH}")
-    creds = service_account.Credentials.from_service_account_file(
-        str(CREDS_PATH), scopes=SCOPES
-    )
-    return build("searchconsole", "v1", credentials=creds)
+    return google_client.get_service(SCOPES, CREDS_PATH)
 
 
 def detect_site_url(service) -> str:
@@ -60,32 +117,10 @@ def detect_site_url(service) -> str:
         sys.exit(f"Could not list sites: {exc}")
 
 
-def query_analytics(service, site_url: str, start: str, end: str,
-                    dimensions: list, row_limit: int = 25,
-                    page_filter: str | None = None,
-                    position_filter: tuple | None = None) -> list:
-    body = {
-        "startDate": start,
-        "endDate": end,
-        "dimensions": dimensions,
-        "rowLimit": row_limit,
-    }
-    filters = []
-    if page_filter:
-        filters.append({
-            "dimension": "page",
-            "operator": "contains",
-            "expression": page_filter,
-        })
-    if position_filter:
-        filters.append({
-            "dimension": "page",
-            "operator": "contains",
-            "expression": "",  # match all
-        })
-    if filters:
-        body["dimensionFilterGroups"] = [{"filters": filters}]
-
+def query_analytics(service, site_url: str, query: Query, start_row: int = 0,
+                    row_limit: int | None = None) -> list:
+    """One searchanalytics.query call (a single API page) for query."""
+    body = query.body(start_row, row_limit)
     resp = service.searchanalytics().query(siteUrl=site_url, body=body).execute()
     return resp.get("rows", [])
 
@@ -110,9 +145,73 @@ def print_table(headers: list, rows: list, alignments: list | None = None) -> No
         print(f"  {line}")
 
 
-def run_summary(service, site_url: str, start: str, end: str, as_json: bool) -> None:
+def _thread_service(factory):
+    # googleapiclient services (and SQLite connections) are not thread-safe; each pool
+    # thread builds its own (cheap now that google_client caches the token and
+    # discovery document).
+    services = _local.__dict__.setdefault("services", {})
+    if factory not in services:
+        services[factory] = factory()
+    return services[factory]
+
+
+def fetch_rows(service, site_url: str, queries: list) -> list:
+    """Rows for several queries that share one API request (same Query.key()).
+
+    Pages are fetched once and each query keeps the rows passing its own metric
+    predicates; paging stops as soon as every query has row_limit rows (GSC sorts by
+    clicks, so the first N matches are the top N). Returns one row list per query.
+    """
+    out = [[] for _ in queries]
+    page_size = max(q.page_size() for q in queries)
+    for _, rows in iter_pages(service, site_url, queries[0], page_size=page_size):
+        for q, got in zip(queries, out):
+            if len(got) < q.row_limit:
+                got.extend(r for r in rows if q.accepts(r))
+        if all(len(got) >= q.row_limit for q, got in zip(queries, out)):
+            break
+    return [got[:q.row_limit] for q, got in zip(queries, out)]
+
+
+def query_many(site_url: str, specs: dict, service_factory=get_service) -> dict:
+    """Run several queries concurrently, merging ones that are the same API request.
+
+    specs maps a name to a Query. Queries differing only in row limit or metric
+    predicates share one stream of pages (see fetch_rows). Returns {name: rows}.
+    service_factory builds the per-thread client (get_service, or
+    gsc_warehouse.LocalService for --local).
+    """
+    groups: dict = {}
+    for name, q in specs.items():
+        groups.setdefault(q.key(), []).append(name)
+
+    def fetch(names):
+        return fetch_rows(_thread_service(service_factory), site_url, [specs[n] for n in names])
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(groups))) as pool:
+        results = list(pool.map(fetch, groups.values()))
+    return {name: rows for names, group_rows in zip(groups.values(), results)
+            for name, rows in zip(names, group_rows)}
+
+
+def _opportunities(base: Query, limit: int) -> Query:
+    lo, hi = OPPORTUNITY_POSITION
+    return (base.with_dimensions(["query"]).where("position", lo, hi)
+            .where("impressions", OPPORTUNITY_MIN_IMPRESSIONS).limit(limit))
+
+
+def run_summary(site_url: str, base: Query, as_json: bool,
+                service_factory=get_service) -> None:
+    start, end = base.start, base.end
+    rows = query_many(site_url, {
+        "totals": base.with_dimensions([]).limit(1),
+        "queries": base.with_dimensions(["query"]).limit(15),
+        "pages": base.with_dimensions(["page"]).limit(15),
+        "opportunities": _opportunities(base, 10),
+    }, service_factory)
+
     # Site totals
-    totals = query_analytics(service, site_url, start, end, dimensions=[], row_limit=1)
+    totals = rows["totals"]
     if totals:
         t = totals[0]
         total_data = {
@@ -125,7 +224,6 @@ def run_summary(service, site_url: str, start: str, end: str, as_json: bool) ->
         total_data = {"clicks": 0, "impressions": 0, "ctr": 0, "position": 0}
 
     # Top queries
-    query_rows = query_analytics(service, site_url, start, end, ["query"], row_limit=15)
     queries_data = [
         {
             "query": r["keys"][0],
@@ -134,11 +232,10 @@ def run_summary(service, site_url: str, start: str, end: str, as_json: bool) ->
             "ctr": round(r["ctr"] * 100, 1),
             "position": round(r["position"], 1),
         }
-        for r in query_rows
+        for r in rows["queries"]
     ]
 
     # Top pages
-    page_rows = query_analytics(service, site_url, start, end, ["page"], row_limit=15)
     pages_data = [
         {
             "page": r["keys"][0].replace("https://avinashsangle.com", ""),
@@ -147,11 +244,10 @@ def run_summary(service, site_url: str, start: str, end: str, as_json: bool) ->
             "ctr": round(r["ctr"] * 100, 1),
             "position": round(r["position"], 1),
         }
-        for r in page_rows
+        for r in rows["pages"]
     ]
 
     # Opportunities (page 2: position 11-20)
-    opp_rows = query_analytics(service, site_url, start, end, ["query"], row_limit=100)
     opportunities = [
         {
             "query": r["keys"][0],
@@ -159,9 +255,8 @@ def run_summary(service, site_url: str, start: str, end: str, as_json: bool) ->
             "impressions": int(r["impressions"]),
             "position": round(r["position"], 1),
         }
-        for r in opp_rows
-        if 10.5 <= r["position"] <= 20.5 and r["impressions"] >= 5
-    ][:10]
+        for r in rows["opportunities"]
+    ]
 
     if as_json:
         print(json.dumps({
@@ -207,20 +302,22 @@ def run_summary(service, site_url: str, start: str, end: str, as_json: bool) ->
     print()
 
 
-def run_single_type(service, site_url: str, start: str, end: str,
-                    report_type: str, page_filter: str | None, as_json: bool) -> None:
+def run_single_type(service, site_url: str, base: Query,
+                    report_type: str, as_json: bool) -> None:
+    start, end = base.start, base.end
     if report_type == "queries":
         dims = ["query"]
     elif report_type == "pages":
         dims = ["page"]
+    elif report_type == "cannibalization":
+        run_cannibalization(service, site_url, base, as_json)
+        return
     elif report_type == "opportunities":
-        rows = query_analytics(service, site_url, start, end, ["query"], row_limit=100,
-                               page_filter=page_filter)
-        opps = [r for r in rows if 10.5 <= r["position"] <= 20.5 and r["impressions"] >= 5]
+        [opps] = fetch_rows(service, site_url, [_opportunities(base, 20)])
         data = [
             {"query": r["keys"][0], "clicks": int(r["clicks"]),
              "impressions": int(r["impressions"]), "position": round(r["position"], 1)}
-            for r in opps[:20]
+            for r in opps
         ]
         if as_json:
             print(json.dumps(data, indent=2))
@@ -233,10 +330,9 @@ def run_single_type(service, site_url: str, start: str, end: str,
             print()
         return
     else:
-        sys.exit(f"Unknown type: {report_type}. Use: queries, pages, opportunities")
+        sys.exit(f"Unknown type: {report_type}. Use: queries, pages, opportunities, cannibalization")
 
-    rows = query_analytics(service, site_url, start, end, dims, row_limit=25,
-                           page_filter=page_filter)
+    [rows] = fetch_rows(service, site_url, [base.with_dimensions(dims).limit(25)])
     data = [
         {
             dims[0]: r["keys"][0].replace("https://avinashsangle.com", "") if dims[0] == "page" else r["keys"][0],
@@ -258,26 +354,381 @@ def run_single_type(service, site_url: str, start: str, end: str,
         print()
 
 
+def find_cannibalization(rows) -> list:
+    """Queries where several pages split the impressions, from ["query", "page"] rows.
+
+    One pass builds a query -> [(page, clicks, impressions, position)] hash index;
+    a second pass over the (much smaller) set of queries scores them. A query is a
+    conflict when at least two pages each get CANNIBAL_MIN_SHARE of its impressions.
+    "split" is the share of impressions not going to the strongest page; "spread"
+    is the gap between the best and worst competing positions. Conflicts are ranked
+    by impressions x split (how much visibility is divided), then spread.
+    """
+    by_query: dict = {}
+    for row in rows:
+        query, page = row["keys"]
+        by_query.setdefault(query, []).append(
+            (page, row["clicks"], row["impressions"], row["position"]))
+
+    conflicts = []
+    for query, pages in by_query.items():
+        if len(pages) < 2:
+            continue
+        total = sum(p[2] for p in pages)
+        if total < CANNIBAL_MIN_IMPRESSIONS:
+            continue
+        competing = sorted((p for p in pages if p[2] >= total * CANNIBAL_MIN_SHARE),
+                           key=lambda p: p[2], reverse=True)
+        if len(competing) < 2:
+            continue
+        positions = [p[3] for p in competing]
+        conflicts.append({
+            "query": query,
+            "impressions": int(total),
+            "clicks": int(sum(p[1] for p in pages)),
+            "split": round(1 - competing[0][2] / total, 3),
+            "spread": round(max(positions) - min(positions), 1),
+            "pages": [
+                {"page": page.replace("https://avinashsangle.com", ""), "clicks": int(clicks),
+                 "share": round(impressions / total, 3), "position": round(position, 1)}
+                for page, clicks, impressions, position in competing
+            ],
+        })
+    conflicts.sort(key=lambda c: (c["impressions"] * c["split"], c["spread"]), reverse=True)
+    return conflicts
+
+
+def run_cannibalization(service, site_url: str, base: Query, as_json: bool) -> None:
+    query = base.with_dimensions(["query", "page"])
+    rows = (row for _, page_rows in iter_pages(service, site_url, query) for row in page_rows)
+    conflicts = find_cannibalization(rows)
+
+    if as_json:
+        print(json.dumps(conflicts, indent=2))
+        return
+    print(f"\n  Keyword cannibalization — {base.start} to {base.end} "
+          f"({len(conflicts)} queries with competing pages)\n")
+    print_table(
+        ["Query", "Impr", "Split%", "PosSpread", "Competing pages (impression share @ position)"],
+        [[c["query"], c["impressions"], round(c["split"] * 100), c["spread"],
+          ", ".join(f"{p['page']} {p['share'] * 100:.0f}% @{p['position']}" for p in c["pages"])]
+         for c in conflicts[:25]],
+    )
+    print()
+
+
+def iter_pages(service, site_url: str, query: Query, start_row: int = 0,
+               page_size: int = API_PAGE_SIZE):
+    """Yield (start_row, rows) for every API page of query, page_size rows at a time."""
+    while True:
+        rows = query_analytics(service, site_url, query, start_row, page_size)
+        if rows:
+            yield start_row, rows
+        if len(rows) < page_size:
+            return
+        start_row += len(rows)
+
+
+def flatten(row: dict, dimensions: list) -> dict:
+    out = dict(zip(dimensions, row.get("keys", [])))
+    out.update(clicks=int(row["clicks"]), impressions=int(row["impressions"]),
+               ctr=row["ctr"], position=row["position"])
+    return out
+
+
+def _write_jsonl_page(path: Path, records: list) -> None:
+    # Each page is its own gzip member; concatenated members are one valid .gz file.
+    with path.open("ab") as fh, gzip.GzipFile(fileobj=fh, mode="wb") as gz:
+        for rec in records:
+            gz.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def _write_parquet_page(path: Path, page_no: int, records: list) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path.mkdir(parents=True, exist_ok=True)
+    tmp = path / f".part-{page_no:05d}.parquet.tmp"
+    pq.write_table(pa.Table.from_pylist(records), tmp, compression="zstd")
+    tmp.replace(path / f"part-{page_no:05d}.parquet")
+
+
+def run_export(service, site_url: str, query: Query, out_path: Path, fmt: str) -> None:
+    """Page through every row of a query and stream it to out_path, resumably.
+
+    Progress is checkpointed after each page in <out_path>.progress.json; rerunning
+    the same command continues from the last completed page. Only one page is held
+    in memory at a time.
+    """
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            sys.exit("Parquet export needs pyarrow: pip install pyarrow (or use --export-format jsonl.gz)")
+
+    progress_path = out_path.with_name(out_path.name + ".progress.json")
+    dimensions = query.dimensions
+    job = {"site": site_url, "body": query.body(row_limit=API_PAGE_SIZE), "format": fmt}
+    state = {"job": job, "next_row": 0, "pages": 0, "rows": 0, "bytes": 0}
+    if progress_path.exists():
+        saved = json.loads(progress_path.read_text())
+        if saved.get("job") == job:
+            state = saved
+            print(f"  Resuming export at row {state['next_row']} ({state['pages']} page(s) done)")
+        else:
+            sys.exit(f"{progress_path} belongs to a different export; delete it or pick another path.")
+    elif out_path.exists():
+        sys.exit(f"{out_path} already exists; delete it or pick another path.")
+
+    if fmt == "jsonl.gz" and out_path.exists():
+        # Drop anything written after the last checkpoint (a page cut off mid-write).
+        with out_path.open("r+b") as fh:
+            fh.truncate(state["bytes"])
+
+    started = time.monotonic()
+    for start_row, rows in iter_pages(service, site_url, query, state["next_row"]):
+        records = [flatten(r, dimensions) for r in rows if query.accepts(r)]
+        if fmt == "parquet":
+            _write_parquet_page(out_path, state["pages"], records)
+        else:
+            _write_jsonl_page(out_path, records)
+            state["bytes"] = out_path.stat().st_size
+        state.update(next_row=start_row + len(rows), pages=state["pages"] + 1,
+                     rows=state["rows"] + len(rows))
+        progress_path.write_text(json.dumps(state))
+        print(f"  page {state['pages']}: {len(rows)} rows (total {state['rows']})", flush=True)
+
+    progress_path.unlink(missing_ok=True)
+    print(f"  Exported {state['rows']} rows in {state['pages']} page(s) to {out_path} "
+          f"in {time.monotonic() - started:.1f}s")
+
+
+def sync_warehouse(start: str, end: str) -> None:
+    """Bring the local warehouse up to date for [start, end], calling the API only if needed."""
+    db = gsc_warehouse.connect()
+    try:
+        pending = gsc_warehouse.days_to_sync(db, start, end)
+        if not pending:
+            return
+        print(f"  Syncing {len(pending)} day(s) into {gsc_warehouse.DB_PATH.name}", file=sys.stderr)
+        client = {}
+
+        def fetch(first, last, dims):
+            if not client:  # built on the first fetch, so a sync with nothing to do stays offline
+                client["service"] = get_service()
+                client["site_url"] = detect_site_url(client["service"])
+            for _, rows in iter_pages(client["service"], client["site_url"], Query(first, last, dims)):
+                yield from rows
+
+        gsc_warehouse.sync(db, start, end, fetch)
+    finally:
+        db.close()
+
+
+def _rounded(value: float, digits: int, scale: float = 1.0):
+    """round(value * scale), or None for NaN (no impressions in that window)."""
+    return None if value != value else round(float(value) * scale, digits)
+
+
+def _signed(value, digits: int = 1) -> str:
+    return "-" if value is None else f"{value:+.{digits}f}"
+
+
+def run_compare(start: str, end: str, as_json: bool) -> None:
+    """Per-query and per-page deltas between [start, end] and the window before it."""
+    import gsc_analytics
+
+    length = date.fromisoformat(end) - date.fromisoformat(start)
+    prev_end = str(date.fromisoformat(start) - timedelta(days=1))
+    prev_start = str(date.fromisoformat(prev_end) - length)
+    sync_warehouse(prev_start, end)
+
+    db = gsc_warehouse.connect()
+    report = {"period": {"start": start, "end": end},
+              "previous": {"start": prev_start, "end": prev_end}}
+    for dim in ("query", "page"):
+        cols = gsc_analytics.load(db, dim, prev_start, end)
+        res = gsc_analytics.compare(cols, (start, end), (prev_start, prev_end))
+        report[dim] = [
+            {
+                dim: key.replace("https://avinashsangle.com", "") if dim == "page" else key,
+                "clicks": int(res["clicks"][i]),
+                "clicks_delta": int(res["clicks_delta"][i]),
+                "impressions": int(res["impressions"][i]),
+                "impressions_delta": int(res["impressions_delta"][i]),
+                "ctr": _rounded(res["ctr"][i], 1, 100),
+                "ctr_delta": _rounded(res["ctr_delta"][i], 1, 100),
+                "position": _rounded(res["position"][i], 1),
+                "position_delta": _rounded(res["position_delta"][i], 1),
+            }
+            for i, key in enumerate(res["key"][:15])
+        ]
+    db.close()
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"\n  Period over period: {start} to {end} vs {prev_start} to {prev_end}")
+    for dim in ("query", "page"):
+        print(f"\n  BIGGEST {dim.upper()} MOVERS (Pos Δ > 0 = ranking worse)")
+        print_table(
+            [dim.title(), "Clicks", "Δ", "Impr", "Δ", "CTR%", "Δ", "Pos", "Δ"],
+            [[r[dim], r["clicks"], _signed(r["clicks_delta"], 0), r["impressions"],
+              _signed(r["impressions_delta"], 0), "-" if r["ctr"] is None else r["ctr"],
+              _signed(r["ctr_delta"]), "-" if r["position"] is None else r["position"],
+              _signed(r["position_delta"])]
+             for r in report[dim]],
+        )
+    print()
+
+
+def run_anomalies(start: str, end: str, as_json: bool) -> None:
+    """Flag days whose clicks for a top query/page break from the previous ANOMALY_WINDOW days."""
+    import gsc_analytics
+    import numpy as np
+
+    # Load an extra baseline window so the first days of the period can be scored too.
+    baseline_start = str(date.fromisoformat(start) - timedelta(days=ANOMALY_WINDOW))
+    sync_warehouse(baseline_start, end)
+
+    db = gsc_warehouse.connect()
+    flagged = []
+    for dim in ("query", "page"):
+        cols = gsc_analytics.load(db, dim, baseline_start, end)
+        if not cols.labels:
+            continue
+        totals = np.bincount(cols.code, weights=cols.impressions, minlength=len(cols.labels))
+        keys = np.argsort(-totals, kind="stable")[:ANOMALY_TOP_KEYS]
+        clicks = gsc_analytics.daily(cols, "clicks", keys)
+        average = gsc_analytics.rolling_mean(clicks, ANOMALY_WINDOW)
+        z = gsc_analytics.zscores(clicks, ANOMALY_WINDOW)
+        for row, day in np.argwhere(np.abs(np.nan_to_num(z)) >= ANOMALY_Z):
+            label = cols.labels[keys[row]]
+            flagged.append({
+                "dimension": dim,
+                "key": label.replace("https://avinashsangle.com", "") if dim == "page" else label,
+                "date": str(np.datetime64(baseline_start) + int(day)),
+                "clicks": int(clicks[row, day]),
+                f"avg_{ANOMALY_WINDOW}d": round(float(average[row, day - 1]), 1),
+                "z": round(float(z[row, day]), 1) if np.isfinite(z[row, day]) else None,
+            })
+    db.close()
+    flagged.sort(key=lambda f: (f["date"], f["dimension"], f["key"]), reverse=True)
+
+    if as_json:
+        print(json.dumps({"period": {"start": start, "end": end}, "window": ANOMALY_WINDOW,
+                          "threshold": ANOMALY_Z, "anomalies": flagged}, indent=2))
+        return
+    print(f"\n  Click anomalies — {start} to {end} (|z| >= {ANOMALY_Z} vs previous "
+          f"{ANOMALY_WINDOW} days, top {ANOMALY_TOP_KEYS} queries and pages)\n")
+    print_table(
+        ["Date", "Dim", "Key", "Clicks", f"Avg{ANOMALY_WINDOW}d", "z"],
+        [[f["date"], f["dimension"], f["key"], f["clicks"], f[f"avg_{ANOMALY_WINDOW}d"],
+          "flat base" if f["z"] is None else f["z"]] for f in flagged],
+    )
+    print()
+
+
+def make_client(start: str, end: str, local: bool = False, use_cache: bool = True) -> tuple:
+    """(service_factory, service, site_url, cache) for a report over [start, end].
+
+    local answers from the warehouse (synced first); otherwise the API is used,
+    through the response cache unless use_cache is False (cache is then None).
+    """
+    if local:
+        sync_warehouse(start, end)
+        return gsc_warehouse.LocalService, gsc_warehouse.LocalService(), SITE_URL, None
+    cache = None
+    if use_cache:
+        cache = gsc_cache.ResponseCache()
+
+        def factory():
+            return gsc_cache.CachingService(get_service, cache)
+    else:
+        factory = get_service
+    service = factory()
+    return factory, service, detect_site_url(service), cache
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Google Search Console report for avinashsangle.com")
     parser.add_argument("--days", type=int, default=28, help="Look back N days (default 28)")
-    parser.add_argument("--type", choices=["queries", "pages", "opportunities"],
+    parser.add_argument("--type", choices=["queries", "pages", "opportunities", "cannibalization"],
                         help="Show only one report type")
     parser.add_argument("--page", help="Filter to a specific page path (e.g. /blog/claude-managed-agents/)")
+    parser.add_argument("--page-regex", help="Only pages matching this RE2 regex")
+    parser.add_argument("--exclude-page-regex", help="Drop pages matching this RE2 regex")
+    parser.add_argument("--query-regex", help="Only queries matching this RE2 regex")
+    parser.add_argument("--exclude-query-regex", help="Drop queries matching this RE2 regex (e.g. brand terms)")
+    parser.add_argument("--device", type=str.upper, choices=DEVICES, help="Only this device")
+    parser.add_argument("--country", help="Only this country (ISO 3166-1 alpha-3, e.g. usa, ind)")
+    parser.add_argument("--search-type", choices=SEARCH_TYPES, default="web",
+                        help="Search type to report on (default web)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--timings", action="store_true", help="Print client startup timings")
+    parser.add_argument("--verbose", action="store_true", help="Print response cache statistics")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the API response cache (scripts/.cache/gsc-responses.sqlite)")
+    parser.add_argument("--export", type=Path, metavar="PATH",
+                        help="Export every row for the window to PATH (paged, resumable)")
+    parser.add_argument("--export-format", choices=["jsonl.gz", "parquet"], default="jsonl.gz",
+                        help="jsonl.gz (one file) or parquet (directory of part files, needs pyarrow)")
+    parser.add_argument("--dimensions", default="date,query,page",
+                        help="Comma-separated export dimensions from date, query, page, device, country "
+                             "(default date,query,page)")
+    parser.add_argument("--local", action="store_true",
+                        help="Sync missing days into the local warehouse and report from it")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare the window with the one before it (per query and page)")
+    parser.add_argument("--anomalies", action="store_true",
+                        help="Flag z-score spikes/drops in daily clicks for top queries and pages")
     args = parser.parse_args()
 
-    end_date = date.today() - timedelta(days=3)  # GSC data has ~3 day lag
+    end_date = date.today() - timedelta(days=gsc_warehouse.FINAL_AFTER_DAYS)  # GSC data lag
     start_date = end_date - timedelta(days=args.days)
+    try:
+        base = (Query(str(start_date), str(end_date))
+                .page(args.page).page_regex(args.page_regex).exclude_page_regex(args.exclude_page_regex)
+                .query_regex(args.query_regex).exclude_query_regex(args.exclude_query_regex)
+                .device(args.device).country(args.country).search_type(args.search_type))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.compare or args.anomalies:
+        if args.export or args.type:
+            parser.error("--compare/--anomalies cannot be combined with --export or --type")
+        if base.filters or base.type != "web":
+            parser.error("--compare/--anomalies report on the whole site; drop the filters")
+        if args.compare:
+            run_compare(str(start_date), str(end_date), args.json)
+        if args.anomalies:
+            run_anomalies(str(start_date), str(end_date), args.json)
+        if args.timings:
+            google_client.print_timings()
+        return
 
-    service = get_service()
-    site_url = detect_site_url(service)
-
-    if args.type:
-        run_single_type(service, site_url, str(start_date), str(end_date),
-                        args.type, args.page, args.json)
+    if args.local and args.export:
+        parser.error("--export reads from the API; drop --local")
+    # Export pages are one-off and would only flush the response cache's LRU.
+    factory, service, site_url, cache = make_client(
+        str(start_date), str(end_date), local=args.local,
+        use_cache=not (args.no_cache or args.export))
+
+    if args.export:
+        dims = [d.strip() for d in args.dimensions.split(",") if d.strip()]
+        bad = [d for d in dims if d not in EXPORT_DIMENSIONS]
+        if bad or not dims:
+            parser.error(f"Unknown dimension(s) {bad}; choose from {', '.join(EXPORT_DIMENSIONS)}")
+        run_export(service, site_url, base.with_dimensions(dims), args.export, args.export_format)
+    elif args.type:
+        run_single_type(service, site_url, base, args.type, args.json)
     else:
-        run_summary(service, site_url, str(start_date), str(end_date), args.json)
+        run_summary(site_url, base, args.json, factory)
+
+    if args.timings:
+        google_client.print_timings()
+    if args.verbose and cache:
+        cache.print_stats()
 
 
 if __name__ == "__main__":
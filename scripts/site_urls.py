@@ -0,0 +1,180 @@
+"""Enumerate the site's canonical URLs offline, from the source tree.
+
+The live sitemap is rendered by src/app/sitemap.ts, so this reads that same file:
+the static `url:` entries, plus every `...<list>.map((x) => ({ url: `...` }))`
+expansion, resolving <list> from the arrays declared in sitemap.ts itself
+(blogPosts, projects) or in src/data/posts.ts (topics). No network and no build
+are needed, so submit_indexnow.py and request_indexing.py can stage submissions in
+CI before a deploy.
+
+Every URL is checked against src/app/**/page.tsx (or route.ts), and, when a build exists, against
+.next/prerender-manifest.json. Mismatches are reported as warnings, since those URLs
+would 404 once deployed.
+
+The result is cached in scripts/.cache/site-urls.json keyed by the mtimes of the
+files it was derived from, so repeat calls skip the parsing.
+
+Usage (as a library):
+    from site_urls import local_entries
+    for url, lastmod in local_entries():
+        ...
+
+Usage (standalone, prints one URL per line):
+    python3 scripts/site_urls.py
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_ROOT = REPO_ROOT / "src" / "app"
+SITEMAP_TS = APP_ROOT / "sitemap.ts"
+POSTS_TS = REPO_ROOT / "src" / "data" / "posts.ts"
+PRERENDER_MANIFEST = REPO_ROOT / ".next" / "prerender-manifest.json"
+CACHE_PATH = REPO_ROOT / "scripts" / ".cache" / "site-urls.json"
+BASE_URL = "https://avinashsangle.com"
+
+_MAP_ENTRY = re.compile(r"\.\.\.(\w+)\.map\(\(\s*(\w+)\s*\)\s*=>\s*\(\{\s*url:\s*`([^`]+)`")
+_STATIC_ENTRY = re.compile(r"\{\s*url:\s*(baseUrl|`[^`$]*\$\{baseUrl\}[^`$]*`)\s*,(.*?)\}", re.S)
+_FIELD = re.compile(r"(\w+):\s*'([^']*)'")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _array_objects(src: str, name: str) -> list | None:
+    """Return the top-level {...} objects of `const <name> = [...]` as field dicts."""
+    m = re.search(rf"const\s+{name}\b[^=]*=\s*\[", src)
+    if not m:
+        return None
+    objects, depth, start = [], 0, None
+    for i in range(m.end(), len(src)):
+        ch = src[i]
+        if ch in "{[":
+            if depth == 0 and ch == "{":
+                start = i
+            depth += 1
+        elif ch in "}]":
+            if depth == 0:
+                break  # closing bracket of the array itself
+            depth -= 1
+            if depth == 0 and ch == "}":
+                # Nested arrays/objects are skipped: only this object's own fields count.
+                body = re.sub(r"\[[^\]]*\]", "", src[start:i + 1])
+                objects.append(dict(_FIELD.findall(body)))
+    return objects
+
+
+def route_file(url_or_path: str) -> Path | None:
+    """The src/app/**/page.tsx or route.ts (static or [dynamic] segment) serving a URL."""
+    path = url_or_path[len(BASE_URL):] if url_or_path.startswith(BASE_URL) else url_or_path
+    dirs = [APP_ROOT]
+    for segment in [s for s in path.split("/") if s]:
+        nxt = []
+        for d in dirs:
+            if (d / segment).is_dir():
+                nxt.append(d / segment)
+            nxt.extend(p for p in d.glob("[[]*[]]") if p.is_dir())
+        dirs = nxt
+    # Static segments were appended before dynamic ones, so the first hit wins like Next.js.
+    for d in dirs:
+        for name in ("page.tsx", "route.ts"):
+            if (d / name).exists():
+                return d / name
+    return None
+
+
+def _source_key() -> dict:
+    """mtimes of the sitemap sources and of every route file under src/app.
+
+    Listing the page.tsx/route.ts files themselves (not their directories' mtimes)
+    catches a route added or removed inside an existing slug directory, and any
+    change under topics/ or the top-level routes.
+    """
+    paths = [SITEMAP_TS, POSTS_TS, PRERENDER_MANIFEST]
+    for name in ("page.tsx", "route.ts"):
+        paths += sorted(APP_ROOT.rglob(name))
+    return {str(p.relative_to(REPO_ROOT)): p.stat().st_mtime_ns if p.exists() else None
+            for p in paths}
+
+
+def _discover() -> tuple:
+    if not SITEMAP_TS.exists():
+        sys.exit(f"sitemap source not found: {SITEMAP_TS}")
+    sitemap_src = SITEMAP_TS.read_text(encoding="utf-8")
+    posts_src = POSTS_TS.read_text(encoding="utf-8") if POSTS_TS.exists() else ""
+    body = sitemap_src[sitemap_src.index("return ["):] if "return [" in sitemap_src else sitemap_src
+
+    entries, warnings = [], []
+    for m in _STATIC_ENTRY.finditer(body):
+        url = BASE_URL if m.group(1) == "baseUrl" else m.group(1).strip("`").replace("${baseUrl}", BASE_URL)
+        lastmod = dict(_FIELD.findall(m.group(2))).get("lastModified")
+        entries.append((m.start(), url, lastmod))
+    for m in _MAP_ENTRY.finditer(body):
+        list_name, var, template = m.groups()
+        items = _array_objects(sitemap_src, list_name)
+        if items is None:
+            items = _array_objects(posts_src, list_name)
+        if items is None:
+            warnings.append(f"sitemap.ts maps over '{list_name}', which could not be resolved")
+            continue
+        for item in items:
+            url = template.replace("${baseUrl}", BASE_URL)
+            url = re.sub(rf"\$\{{{var}\.(\w+)\}}", lambda f: item.get(f.group(1), ""), url)
+            lastmod = item.get("lastModified")
+            entries.append((m.start(), url, lastmod if lastmod and _DATE.match(lastmod) else None))
+
+    # Same order as the rendered sitemap (sort is stable, so list order is kept).
+    entries.sort(key=lambda e: e[0])
+    seen, unique = set(), []
+    for _, url, lastmod in entries:
+        if url not in seen:
+            seen.add(url)
+            unique.append((url, lastmod))
+
+    prerendered = None
+    if PRERENDER_MANIFEST.exists():
+        try:
+            prerendered = set(json.loads(PRERENDER_MANIFEST.read_text()).get("routes", {}))
+        except json.JSONDecodeError:
+            warnings.append(f"{PRERENDER_MANIFEST} is not valid JSON; skipped build check")
+    for url, _ in unique:
+        path = url[len(BASE_URL):] or "/"
+        if route_file(path) is None:
+            warnings.append(f"{url}: no src/app page.tsx or route.ts serves {path}")
+        elif prerendered is not None and path not in prerendered:
+            warnings.append(f"{url}: not prerendered in the .next build")
+    return unique, warnings
+
+
+def local_entries(verbose: bool = True) -> list:
+    """Return (url, lastmod) pairs the sitemap would list, derived from the source tree."""
+    key = _source_key()
+    cached = None
+    if CACHE_PATH.exists():
+        try:
+            cached = json.loads(CACHE_PATH.read_text())
+        except json.JSONDecodeError:
+            cached = None
+    if cached and cached.get("key") == key:
+        entries, warnings = [tuple(e) for e in cached["entries"]], cached["warnings"]
+    else:
+        entries, warnings = _discover()
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_PATH.write_text(json.dumps({"key": key, "entries": entries, "warnings": warnings},
+                                         indent=2) + "\n")
+    if verbose:
+        for w in warnings:
+            print(f"  warning: {w}", file=sys.stderr)
+    if not entries:
+        sys.exit(f"No URLs found in {SITEMAP_TS}")
+    return entries
+
+
+def main() -> None:
+    for url, _ in local_entries():
+        print(url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Streaming sitemap reader shared by submit_indexnow.py and request_indexing.py.
+
+Yields (url, lastmod) pairs as bytes arrive instead of buffering the whole document,
+follows <sitemapindex> children concurrently, decompresses .xml.gz (or
+Content-Encoding: gzip) on the fly, and keeps a disk cache under
+scripts/.cache/sitemaps/ that is revalidated with ETag / If-Modified-Since, so an
+unchanged sitemap costs a 304 instead of a full download.
+
+Like the original reader in submit_indexnow.py this scans with regexes rather than
+an XML parser (no XXE / entity-expansion surface).
+
+Usage (as a library):
+    from sitemap_reader import iter_sitemap
+    for url, lastmod in iter_sitemap("https://avinashsangle.com/sitemap.xml"):
+        ...
+
+Usage (standalone, prints one URL per line):
+    python3 scripts/sitemap_reader.py [sitemap-url]
+"""
+
+import codecs
+import hashlib
+import json
+import queue
+import re
+import sys
+import threading
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import unescape
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO_ROOT / "scripts" / ".cache" / "sitemaps"
+DEFAULT_SITEMAP = "https://avinashsangle.com/sitemap.xml"
+CHUNK = 64 * 1024
+MAX_WORKERS = 4
+
+_BLOCK = re.compile(r"<(url|sitemap)\b[^>]*>(.*?)</\1>", re.S)
+_LOC = re.compile(r"<loc>(.*?)</loc>", re.S)
+_LASTMOD = re.compile(r"<lastmod>(.*?)</lastmod>", re.S)
+# Opening <url>/<sitemap> tag (not <urlset>/<sitemapindex>). Once complete blocks have
+# been consumed, the first one left in the buffer starts the block still streaming in.
+_OPEN = re.compile(r"<(?:url|sitemap)(?=[\s>])")
+
+
+def _cache_paths(url: str) -> tuple:
+    stem = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{stem}.xml", CACHE_DIR / f"{stem}.json"
+
+
+def _chunks(url: str, cancel: threading.Event):
+    """Yield decompressed XML bytes for url, from the network or the revalidated cache."""
+    body_path, meta_path = _cache_paths(url)
+    headers = {"Accept-Encoding": "gzip"}
+    if body_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req, timeout=30)
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304:
+            raise
+        with body_path.open("rb") as fh:
+            while not cancel.is_set() and (data := fh.read(CHUNK)):
+                yield data
+        return
+
+    with resp:
+        gzipped = url.endswith(".gz") or resp.headers.get("Content-Encoding") == "gzip"
+        inflate = zlib.decompressobj(zlib.MAX_WBITS | 32) if gzipped else None  # auto gzip/zlib
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = body_path.with_suffix(f".{threading.get_ident()}.tmp")
+        complete = False
+        try:
+            with tmp_path.open("wb") as cache:
+                while not cancel.is_set() and (data := resp.read(CHUNK)):
+                    if inflate:
+                        data = inflate.decompress(data)
+                    cache.write(data)
+                    yield data
+                if inflate:
+                    tail = inflate.flush()
+                    cache.write(tail)
+                    yield tail
+                complete = not cancel.is_set()
+            if complete:
+                # Only a fully read body becomes the cache entry.
+                tmp_path.replace(body_path)
+                meta_path.write_text(json.dumps({
+                    "url": url,
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                }))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+def _entries(url: str, cancel: threading.Event):
+    """Yield (kind, loc, lastmod) for each complete <url>/<sitemap> block as it streams in."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    buf = ""
+    for data in _chunks(url, cancel):
+        buf += decoder.decode(data)
+        end = 0
+        for m in _BLOCK.finditer(buf):
+            loc = _LOC.search(m.group(2))
+            if loc:
+                lastmod = _LASTMOD.search(m.group(2))
+                yield (m.group(1), unescape(loc.group(1).strip()),
+                       lastmod.group(1).strip() if lastmod else None)
+            end = m.end()
+        buf = buf[end:]
+        # Drop leading text that cannot be part of a block (XML prolog, <urlset ...>).
+        open_tag = _OPEN.search(buf)
+        buf = buf[open_tag.start():] if open_tag else buf[-64:]
+
+
+def iter_sitemap(url: str = DEFAULT_SITEMAP, max_workers: int = MAX_WORKERS):
+    """Yield (url, lastmod) for every page in url, following nested sitemap indexes.
+
+    Child sitemaps are fetched concurrently; entries are yielded in arrival order.
+    Exits with a message if any sitemap in the tree cannot be fetched.
+    """
+    results: queue.Queue = queue.Queue()
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    seen = set()
+    pending = 0
+
+    def work(sitemap_url: str) -> None:
+        try:
+            for kind, loc, lastmod in _entries(sitemap_url, cancel):
+                results.put(("sitemap" if kind == "sitemap" else "url", loc, lastmod))
+        except (urllib.error.URLError, OSError, zlib.error) as exc:
+            results.put(("error", sitemap_url, exc))
+        finally:
+            results.put(("done", sitemap_url, None))
+
+    def schedule(sitemap_url: str) -> None:
+        nonlocal pending
+        if sitemap_url in seen:
+            return
+        seen.add(sitemap_url)
+        pending += 1
+        pool.submit(work, sitemap_url)
+
+    try:
+        # Scheduling and the pending count only ever change on this thread; workers
+        # report child sitemaps back through the queue instead of submitting them.
+        schedule(url)
+        while pending:
+            kind, loc, extra = results.get()
+            if kind == "done":
+                pending -= 1
+            elif kind == "sitemap":
+                schedule(loc)
+            elif kind == "error":
+                sys.exit(f"Could not fetch {loc}: {extra}")
+            else:
+                yield loc, extra
+    finally:
+        cancel.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def main() -> None:
+    url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SITEMAP
+    for loc, _ in iter_sitemap(url):
+        print(loc)
+
+
+if __name__ == "__main__":
+    main()
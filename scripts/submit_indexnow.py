@@ -13,10 +13,40 @@ rejects redirects with "The inspected URL is a redirect and cannot be indexed."
 --all reads the live sitemap (generated by src/app/sitemap.ts), which is the same
 document search engines fetch, so it is canonical by construction.
 
+--incremental keeps a ledger (scripts/.cache/indexnow-ledger.json) of each URL's
+<lastmod> and a fingerprint of its rendered content, and submits only URLs that are
+new or changed since the last successful submission. Only URLs an endpoint accepted
+advance in the ledger, so anything that failed is retried on the next run.
+
+Submission splits the URL list into protocol-sized batches (10,000 URLs max per
+POST) and fans every batch out to each endpoint in --endpoints from a small thread
+pool. Each worker keeps one keep-alive connection per endpoint host. 429 and 5xx
+responses are retried with jittered exponential backoff (honouring Retry-After).
+The per-endpoint summary and the per-batch outcomes are written to
+scripts/.cache/indexnow-last-run.json, so a partial failure leaves a record. Engines
+share IndexNow submissions, so a URL counts as accepted once any endpoint takes it.
+
+Before anything is posted, a preflight stage GETs every candidate URL over pooled
+keep-alive connections (without following redirects) and refuses the run, with a
+table, if any URL is not a 200, carries a Location header, or declares a
+<link rel="canonical"> other than itself. Results are cached per URL and ETag in
+scripts/.cache/indexnow-probe.json, so unchanged pages revalidate with a 304.
+Skip it with --skip-preflight; --dry-run never runs it.
+
+--source local reads the URL list offline from src/app/sitemap.ts (see site_urls.py)
+instead of the live sitemap, so a CI job can stage submissions right after a build.
+With --incremental it fingerprints each route's page.tsx rather than fetching the
+page, so it needs no network until the actual POST. The two sources fingerprint
+differently, so switching between them resubmits everything once. Pair it with
+--dry-run or --skip-preflight before the deploy is live.
+
 Usage:
     python3 scripts/submit_indexnow.py <url> [<url> ...]   # submit specific URLs
     python3 scripts/submit_indexnow.py --all               # submit every URL in the live sitemap
     python3 scripts/submit_indexnow.py --all --dry-run     # show what would be sent
+    python3 scripts/submit_indexnow.py --incremental       # only new/changed sitemap URLs
+    python3 scripts/submit_indexnow.py --all --endpoints indexnow,bing   # pick endpoints
+    python3 scripts/submit_indexnow.py --all --source local --dry-run   # offline, no sitemap fetch
 
 Examples:
     python3 scripts/submit_indexnow.py https://avinashsangle.com/blog/claude-md-guide
@@ -24,33 +54,139 @@ Examples:
 """
 
 import argparse
+import hashlib
+import http.client
 import json
+import random
 import re
 import sys
+import threading
+import time
 import urllib.error
+import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from site_urls import local_entries, route_file
+from sitemap_reader import iter_sitemap
 
 KEY = "589c30d54f9f3681d19765a4f3dd71b6"
 HOST = "avinashsangle.com"
 KEY_LOCATION = f"https://{HOST}/{KEY}.txt"
-ENDPOINT = "https://api.indexnow.org/indexnow"
+# IndexNow endpoints (all share submissions with each other and the other engines).
+ENDPOINTS = {
+    "indexnow": "api.indexnow.org",
+    "bing": "www.bing.com",
+    "yandex": "yandex.com",
+}
+ENDPOINT_PATH = "/indexnow"
+MAX_BATCH = 10_000      # protocol limit on urlList per POST
+MAX_WORKERS = 6
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0      # seconds; doubled per attempt, then jittered
+BACKOFF_CAP = 30.0
 SITEMAP_URL = f"https://{HOST}/sitemap.xml"
 ORIGIN = f"https://{HOST}"
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LEDGER_PATH = REPO_ROOT / "scripts" / ".cache" / "indexnow-ledger.json"
+RUN_LOG_PATH = REPO_ROOT / "scripts" / ".cache" / "indexnow-last-run.json"
+PROBE_CACHE_PATH = REPO_ROOT / "scripts" / ".cache" / "indexnow-probe.json"
+PROBE_WORKERS = 16
 
-def urls_from_sitemap() -> list:
+# Stripped before fingerprinting: every deploy rehashes the JS/CSS chunk names in
+# these tags, which would otherwise make every page look changed after each build.
+_VOLATILE = re.compile(r"<script\b.*?</script>|<style\b.*?</style>|<link\b[^>]*>", re.S | re.I)
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.I)
+_ATTR = re.compile(r"""([a-zA-Z-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+
+def entries_from_sitemap(source: str = "sitemap") -> list:
+    """Return (url, lastmod) pairs from the live sitemap; lastmod is None if absent.
+
+    source="local" derives the same list offline from src/app/sitemap.ts instead.
+    """
+    if source == "local":
+        return local_entries()
     # Read the LIVE sitemap (src/app/sitemap.ts renders /sitemap.xml) rather than a file
     # on disk. A checked-in copy silently goes stale and takes IndexNow down with it.
-    # Regex extraction avoids an XML parser (no XXE surface).
+    # sitemap_reader streams it, follows sitemap indexes and revalidates its disk cache.
+    entries = list(iter_sitemap(SITEMAP_URL))
+    if not entries:
+        sys.exit(f"No <loc> entries found in {SITEMAP_URL}")
+    return entries
+
+
+def urls_from_sitemap(source: str = "sitemap") -> list:
+    return [url for url, _ in entries_from_sitemap(source)]
+
+
+def source_fingerprint(url: str) -> str | None:
+    """Hash the page.tsx/route.ts that renders url; the offline stand-in for fingerprint()."""
+    path = route_file(url)
+    if path is None:
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def fingerprint(url: str) -> str | None:
+    """Hash the page's rendered HTML minus build-specific tags; None if unreachable."""
     try:
-        with urllib.request.urlopen(SITEMAP_URL, timeout=30) as resp:
+        with urllib.request.urlopen(url, timeout=30) as resp:
             body = resp.read().decode("utf-8", "replace")
-    except (urllib.error.URLError, urllib.error.HTTPError) as exc:
-        sys.exit(f"Could not fetch {SITEMAP_URL}: {exc}")
-    urls = [m.strip() for m in re.findall(r"<loc>(.*?)</loc>", body, re.S)]
-    if not urls:
-        sys.exit(f"No <loc> entries found in {SITEMAP_URL}")
-    return urls
+    except (urllib.error.URLError, urllib.error.HTTPError):
+        return None
+    return hashlib.sha256(_VOLATILE.sub("", body).encode("utf-8")).hexdigest()[:16]
+
+
+def load_ledger() -> dict:
+    if not LEDGER_PATH.exists():
+        return {}
+    try:
+        return json.loads(LEDGER_PATH.read_text())
+    except json.JSONDecodeError:
+        print(f"Ledger {LEDGER_PATH} is corrupt; treating every URL as new.")
+        return {}
+
+
+def save_ledger(ledger: dict) -> None:
+    LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = LEDGER_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(ledger, indent=2, sort_keys=True) + "\n")
+    tmp.replace(LEDGER_PATH)
+
+
+def diff_against_ledger(entries: list, ledger: dict, fingerprint_fn=fingerprint) -> tuple:
+    """Split sitemap entries into (changed, skipped, records).
+
+    A URL whose <lastmod> is present and unchanged is skipped without fetching it.
+    Everything else is fingerprinted and counts as changed only if the fingerprint
+    differs from (or is missing in) the ledger; an unreachable page is always treated
+    as changed so it is not silently dropped from the ledger's view.
+    """
+    to_fetch = [url for url, lastmod in entries
+                if not (lastmod and url in ledger and ledger[url].get("lastmod") == lastmod)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        prints = dict(zip(to_fetch, pool.map(fingerprint_fn, to_fetch)))
+
+    changed, skipped, records = [], [], {}
+    for url, lastmod in entries:
+        prev = ledger.get(url)
+        if url not in prints:
+            skipped.append(url)
+            records[url] = prev
+            continue
+        fp = prints[url]
+        records[url] = {**(prev or {}), "lastmod": lastmod, "fingerprint": fp}
+        # A new <lastmod> alone is not a change: pages whose lastmod is the build date
+        # (home, hubs, about, ...) would otherwise be resubmitted on every run.
+        if prev is None or fp is None or prev.get("fingerprint") != fp:
+            changed.append(url)
+        else:
+            skipped.append(url)
+    return changed, skipped, records
 
 
 def reject_redirects(urls: list) -> None:
@@ -64,55 +200,279 @@ def reject_redirects(urls: list) -> None:
         )
 
 
-def submit(urls: list, dry_run: bool) -> None:
+def batches(urls: list, size: int) -> list:
+    return [urls[i:i + size] for i in range(0, len(urls), size)]
+
+
+_local = threading.local()
+
+
+def _connection(host: str) -> http.client.HTTPSConnection:
+    # One keep-alive connection per (worker thread, host); http.client
+    # connections are not thread-safe, so they are never shared across workers.
+    conns = _local.__dict__.setdefault("conns", {})
+    if host not in conns:
+        conns[host] = http.client.HTTPSConnection(host, timeout=30)
+    return conns[host]
+
+
+def _backoff(attempt: int, retry_after: str | None) -> float:
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_CAP)
+    return random.uniform(0.5, 1.0) * min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+
+
+def post_batch(name: str, index: int, urls: list) -> dict:
+    """POST one batch to one endpoint, retrying 429/5xx/network errors."""
+    host = ENDPOINTS[name]
+    body = json.dumps({"host": HOST, "key": KEY, "keyLocation": KEY_LOCATION, "urlList": urls})
+    headers = {"Content-Type": "application/json; charset=utf-8", "Connection": "keep-alive"}
+    started = time.monotonic()
+    code, detail = None, ""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        conn = _connection(host)
+        retry_after = None
+        try:
+            conn.request("POST", ENDPOINT_PATH, body=body.encode("utf-8"), headers=headers)
+            resp = conn.getresponse()
+            code = resp.status
+            retry_after = resp.getheader("Retry-After")
+            detail = resp.read().decode("utf-8", "replace")[:300]
+        except (OSError, http.client.HTTPException) as exc:
+            # Dropped keep-alive or network blip: reconnect on the next attempt.
+            conn.close()
+            code, detail = None, str(exc)
+        if code in (200, 202):
+            break
+        if code is not None and code != 429 and code < 500:
+            break  # 400/403/422: the request itself is wrong, retrying will not help
+        if attempt < MAX_ATTEMPTS:
+            time.sleep(_backoff(attempt, retry_after))
+    return {
+        "endpoint": name,
+        "batch": index,
+        "urls": len(urls),
+        "status": code,
+        "ok": code in (200, 202),
+        "attempts": attempt,
+        "latency": round(time.monotonic() - started, 3),
+        "detail": "" if code in (200, 202) else detail,
+    }
+
+
+def print_summary(results: list, endpoints: list) -> None:
+    headers = ["Endpoint", "Batches", "URLs", "Status", "Attempts", "Max latency"]
+    rows = []
+    for name in endpoints:
+        mine = [r for r in results if r["endpoint"] == name]
+        statuses = sorted({str(r["status"]) for r in mine})
+        rows.append([
+            name,
+            f"{sum(r['ok'] for r in mine)}/{len(mine)} ok",
+            sum(r["urls"] for r in mine if r["ok"]),
+            ",".join(statuses),
+            sum(r["attempts"] for r in mine),
+            f"{max((r['latency'] for r in mine), default=0):.2f}s",
+        ])
+    widths = [max(len(h), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  " + "  ".join(h.ljust(widths[i]) for i, h in enumerate(headers)))
+    print("  " + "  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  " + "  ".join(str(c).ljust(widths[i]) for i, c in enumerate(row)))
+    for r in results:
+        if not r["ok"]:
+            print(f"  ! {r['endpoint']} batch {r['batch']} failed ({r['status']}): {r['detail']}")
+
+
+def canonical_of(html: str) -> str | None:
+    for tag in _LINK_TAG.findall(html):
+        attrs = {m.group(1).lower(): m.group(2) if m.group(2) is not None else m.group(3)
+                 for m in _ATTR.finditer(tag)}
+        if attrs.get("rel", "").lower() == "canonical":
+            return attrs.get("href")
+    return None
+
+
+def probe_url(url: str, cached: dict | None) -> dict:
+    """GET url without following redirects; reuse the cached result on a 304."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    headers = {"Connection": "keep-alive", "User-Agent": "avinashsangle-indexnow-preflight"}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    for attempt in range(2):
+        conn = _connection(parts.netloc)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+            break
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()  # stale keep-alive: reconnect once before giving up
+            if attempt:
+                return {"status": None, "problem": f"unreachable ({exc})"}
+    if resp.status == 304 and cached:
+        return {**cached, "from_cache": True}
+
+    location = resp.getheader("Location")
+    canonical = canonical_of(body.decode("utf-8", "replace")) if resp.status == 200 else None
+    if location:
+        problem = f"redirects to {location}"
+    elif resp.status != 200:
+        problem = f"HTTP {resp.status}"
+    elif canonical and canonical.rstrip("/") != url.rstrip("/"):
+        problem = f"canonical is {canonical}"
+    else:
+        problem = ""
+    return {"status": resp.status, "etag": resp.getheader("ETag"),
+            "canonical": canonical, "problem": problem}
+
+
+def preflight(urls: list) -> None:
+    """Probe every URL concurrently and exit with a table if any would be rejected."""
+    try:
+        cache = json.loads(PROBE_CACHE_PATH.read_text()) if PROBE_CACHE_PATH.exists() else {}
+    except json.JSONDecodeError:
+        cache = {}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(urls))) as pool:
+        results = dict(zip(urls, pool.map(lambda u: probe_url(u, cache.get(u)), urls)))
+    elapsed = time.monotonic() - started
+
+    hits = sum(1 for r in results.values() if r.pop("from_cache", False))
+    print(f"Preflight: {len(urls)} URL(s) checked in {elapsed:.2f}s ({hits} unchanged since last probe).")
+    cache.update({u: r for u, r in results.items() if r.get("etag") and not r["problem"]})
+    PROBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    PROBE_CACHE_PATH.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n")
+
+    bad = [(u, r) for u, r in results.items() if r["problem"]]
+    if not bad:
+        return
+    width = max(len(u) for u, _ in bad)
+    lines = [f"  {'URL'.ljust(width)}  Status  Problem", f"  {'-' * width}  ------  -------"]
+    lines += [f"  {u.ljust(width)}  {str(r['status']).ljust(6)}  {r['problem']}" for u, r in bad]
+    sys.exit(f"Refusing: {len(bad)} URL(s) failed preflight:\n" + "\n".join(lines))
+
+
+def submit(urls: list, dry_run: bool, endpoints: list | None = None,
+           check_live: bool = True) -> list:
+    """Fan the URLs out to every endpoint; return the URLs at least one endpoint accepted."""
     if not urls:
         sys.exit("No URLs to submit.")
     bad = [u for u in urls if not u.startswith(f"https://{HOST}")]
     if bad:
         sys.exit(f"Refusing: these URLs are not on {HOST}: {bad}")
     reject_redirects(urls)
-
-    payload = {"host": HOST, "key": KEY, "keyLocation": KEY_LOCATION, "urlList": urls}
+    if check_live and not dry_run:  # nothing is posted on a dry run, which may precede the deploy
+        preflight(urls)
+    endpoints = endpoints or list(ENDPOINTS)
+    chunks = batches(urls, MAX_BATCH)
 
     if dry_run:
-        print(f"DRY RUN — would POST {len(urls)} URL(s) to {ENDPOINT}:")
+        print(f"DRY RUN — would POST {len(urls)} URL(s) in {len(chunks)} batch(es) to "
+              f"{', '.join(ENDPOINTS[e] for e in endpoints)}:")
         for u in urls:
             print(f"  {u}")
-        return
+        return []
 
-    req = urllib.request.Request(
-        ENDPOINT,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json; charset=utf-8"},
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            code = resp.status
-    except urllib.error.HTTPError as exc:
-        # IndexNow uses status codes as the response; 200/202 are success.
-        code = exc.code
-        if code not in (200, 202):
-            body = exc.read().decode("utf-8", "replace")[:300]
-            sys.exit(f"IndexNow rejected submission ({code}): {body}")
-
-    meaning = {200: "OK", 202: "Accepted (key validation pending)"}.get(code, str(code))
-    print(f"Submitted {len(urls)} URL(s) — IndexNow returned {code} ({meaning}).")
-    for u in urls:
+    started = time.monotonic()
+    results = []
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks) * len(endpoints))) as pool:
+        futures = [pool.submit(post_batch, name, i, chunk)
+                   for i, chunk in enumerate(chunks) for name in endpoints]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+    results.sort(key=lambda r: (r["batch"], endpoints.index(r["endpoint"])))
+    elapsed = time.monotonic() - started
+
+    RUN_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RUN_LOG_PATH.write_text(json.dumps({
+        "at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "urls": len(urls),
+        "elapsed": round(elapsed, 3),
+        "results": results,
+    }, indent=2) + "\n")
+
+    accepted_batches = {r["batch"] for r in results if r["ok"]}
+    accepted = [u for i, chunk in enumerate(chunks) if i in accepted_batches for u in chunk]
+    print(f"Submitted {len(urls)} URL(s) in {len(chunks)} batch(es) to "
+          f"{len(endpoints)} endpoint(s) in {elapsed:.2f}s — {len(accepted)} accepted.")
+    print_summary(results, endpoints)
+    for u in accepted:
         print(f"  {u}")
+    return accepted
+
+
+def run_incremental(dry_run: bool, endpoints: list, check_live: bool, source: str) -> None:
+    entries = entries_from_sitemap(source)
+    # Fail on redirecting URLs before spending a fetch on each page.
+    reject_redirects([url for url, _ in entries])
+    ledger = load_ledger()
+    fingerprint_fn = source_fingerprint if source == "local" else fingerprint
+    changed, skipped, records = diff_against_ledger(entries, ledger, fingerprint_fn)
+
+    print(f"Sitemap: {len(entries)} URL(s) — {len(changed)} new/changed, {len(skipped)} unchanged.")
+    if skipped:
+        print("Skipping unchanged:")
+        for u in skipped:
+            print(f"  {u}")
+    if not changed:
+        print("Nothing to submit.")
+        if not dry_run:  # keep the refreshed lastmods, so those pages aren't re-fetched next run
+            save_ledger({u: r for u, r in records.items() if r is not None})
+        return
+
+    accepted = submit(changed, dry_run, endpoints, check_live)
+    if dry_run:
+        return
+
+    # Only accepted URLs advance in the ledger; the rest keep their previous record
+    # (or none), so they show up as changed again on the next run.
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    accepted_set = set(accepted)
+    for url in changed:
+        if url in accepted_set:
+            records[url] = {**records[url], "submitted_at": now}
+        else:
+            records[url] = ledger.get(url)
+    save_ledger({u: r for u, r in records.items() if r is not None})
+    if len(accepted) < len(changed):
+        sys.exit(f"{len(changed) - len(accepted)} URL(s) were not accepted by any endpoint.")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Submit URLs to IndexNow (Bing/DuckDuckGo/Yandex).")
     parser.add_argument("urls", nargs="*", help="Specific URLs to submit")
     parser.add_argument("--all", action="store_true", help="Submit every URL in the live sitemap")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Submit only sitemap URLs that are new or changed since the last run")
     parser.add_argument("--dry-run", action="store_true", help="Print URLs without submitting")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"Comma-separated endpoints to notify (default: {','.join(ENDPOINTS)})")
+    parser.add_argument("--source", choices=["sitemap", "local"], default="sitemap",
+                        help="Where --all/--incremental get URLs: the live sitemap, or src/app/sitemap.ts "
+                             "read offline (default: sitemap)")
+    parser.add_argument("--skip-preflight", action="store_true",
+                        help="Do not probe URLs for redirects/errors/canonicals before submitting")
     args = parser.parse_args()
 
-    urls = urls_from_sitemap() if args.all else args.urls
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown or not endpoints:
+        parser.error(f"Unknown endpoint(s) {unknown}; choose from {', '.join(ENDPOINTS)}")
+
+    if args.incremental:
+        run_incremental(args.dry_run, endpoints, not args.skip_preflight, args.source)
+        return
+
+    urls = urls_from_sitemap(args.source) if args.all else args.urls
     if not urls:
         parser.error("Provide URLs or use --all")
-    submit(urls, args.dry_run)
+    accepted = submit(urls, args.dry_run, endpoints, not args.skip_preflight)
+    if not args.dry_run and len(accepted) < len(urls):
+        sys.exit(f"{len(urls) - len(accepted)} URL(s) were not accepted by any endpoint.")
 
 
 if __name__ == "__main__":